@@ -0,0 +1,63 @@
+"""
+Numeric kernels for the backtester.
+Compiled with numba when it is installed, otherwise run as NumPy.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange, types as nb_types
+except ImportError:  # optional: NumPy fallbacks below
+    njit = None
+    prange = range
+
+
+NS_PER_DAY = 86_400_000_000_000
+
+# Below this many positions thread start-up costs more than the parallel loop saves
+PARALLEL_MIN_POSITIONS = 4096
+
+
+def _decay_positions_np(premium: np.ndarray, iv: np.ndarray, days_to_expiry: np.ndarray, days_passed: float):
+    """NumPy fallback for decay_positions (same arithmetic, vectorized)."""
+    active = (days_to_expiry > 0) & (iv == iv) & (iv != 0)
+    theta = iv[active] * premium[active] / (days_to_expiry[active] + 1)
+    premium[active] = np.maximum(0.0, premium[active] - theta * days_passed)
+
+
+def _decay_positions_loop(premium, iv, days_to_expiry, days_passed):
+    """
+    Apply one step of theta decay to open positions in place.
+    
+    Args:
+        premium: Position premiums (updated in place)
+        iv: Implied volatility per position (NaN when unknown)
+        days_to_expiry: Whole days until expiry per position
+        days_passed: Days elapsed since the previous update
+    """
+    for i in prange(premium.shape[0]):
+        # Expired positions and positions without IV are not decayed
+        if days_to_expiry[i] > 0 and iv[i] == iv[i] and iv[i] != 0:
+            theta = iv[i] * premium[i] / (days_to_expiry[i] + 1)
+            premium[i] = max(0.0, premium[i] - theta * days_passed)
+
+
+if njit is not None:
+    # Explicit signature compiles at import (and caches to disk) instead of
+    # stalling the first backtest bar
+    _decay_signature = nb_types.void(
+        nb_types.Array(nb_types.float64, 1, 'A'),
+        nb_types.Array(nb_types.float64, 1, 'A', readonly=True),
+        nb_types.Array(nb_types.int64, 1, 'A', readonly=True),
+        nb_types.float64,
+    )
+    _decay_positions_serial = njit(_decay_signature, cache=True)(_decay_positions_loop)
+    _decay_positions_parallel = njit(_decay_signature, parallel=True, cache=True)(_decay_positions_loop)
+    
+    def decay_positions(premium, iv, days_to_expiry, days_passed):
+        """Run the decay kernel, spreading large position books across threads."""
+        if premium.shape[0] >= PARALLEL_MIN_POSITIONS:
+            _decay_positions_parallel(premium, iv, days_to_expiry, days_passed)
+        else:
+            _decay_positions_serial(premium, iv, days_to_expiry, days_passed)
+else:
+    decay_positions = _decay_positions_np
@@ -0,0 +1,282 @@
+"""
+Shared body of the live prediction scripts.
+
+predict_live.py runs it with safe=False and predict_live_safe.py with
+safe=True. Safe mode explains LightGBM import failures and checks that
+the NSE API is reachable instead of printing a traceback.
+
+Set PREDICT_API_URL (e.g. http://localhost:8000) to ask a running
+api_server.py for the prediction instead of loading the model in this
+process; the server keeps the model resident across requests.
+
+Pass --pretty to indent the saved JSON file.
+"""
+import sys
+import os
+import json
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # optional: stdlib encoder/parser below
+    orjson = None
+    json_loads = json.loads
+
+
+def fetch_from_server(server_url: str, symbol: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a prediction from a running API server (GET /predict/{symbol}).
+    
+    Args:
+        server_url: Base URL of api_server.py
+        symbol: Option symbol
+    
+    Returns:
+        Prediction result dictionary or None if the server could not produce one
+    
+    Raises:
+        requests.exceptions.ConnectionError: If the server is not reachable
+    """
+    import requests
+    
+    response = requests.get(f"{server_url.rstrip('/')}/predict/{symbol}", timeout=30)
+    if response.status_code != 200:
+        return None
+    return json_loads(response.content)
+
+
+def _import_predictor(safe: bool):
+    """
+    Import OptionChainPredictor (and with it LightGBM).
+    
+    Args:
+        safe: Check LightGBM on its own first so its failure can be reported clearly
+    
+    Returns:
+        The OptionChainPredictor class
+    """
+    if safe:
+        try:
+            import lightgbm as lgb
+        except (ImportError, FileNotFoundError, OSError) as lgb_error:
+            raise ImportError(f"LightGBM import failed: {lgb_error}")
+    
+    from src.fetch_predict import OptionChainPredictor
+    return OptionChainPredictor
+
+
+def _check_nse_connection(symbol: str):
+    """Test the NSE API without a model, for when LightGBM cannot be imported."""
+    try:
+        import requests
+        print("Testing NSE API connection...")
+        session = requests.Session()
+        session.headers.update({
+            "User-Agent": "Mozilla/5.0",
+            "Accept": "application/json"
+        })
+        session.get("https://www.nseindia.com")
+        url = f"https://www.nseindia.com/api/option-chain-indices?symbol={symbol}"
+        response = session.get(url, timeout=10)
+        
+        if response.status_code == 200:
+            data = json_loads(response.content)
+            spot = data.get('records', {}).get('underlyingValue')
+            if spot:
+                print(f"✓ Successfully fetched data!")
+                print(f"  Spot Price: ₹{spot}")
+                print(f"  Market appears to be open")
+            else:
+                print("✓ API accessible but market may be closed")
+        else:
+            print(f"⚠ API returned status {response.status_code}")
+            print("  Market may be closed or API restricted")
+    except Exception as fetch_error:
+        print(f"⚠ Could not fetch data: {fetch_error}")
+        print("  Market is likely closed (NSE hours: 9:15 AM - 3:30 PM IST)")
+
+
+def _report_import_error(e: Exception, symbol: str):
+    """Explain a failed predictor import and exit (safe mode only)."""
+    if "lightgbm" in str(e).lower():
+        print("❌ LightGBM Import Error")
+        print()
+        print("Python 3.13 has compatibility issues with LightGBM on Windows.")
+        print("Solutions:")
+        print("  1. Use Python 3.11 or 3.12 (recommended)")
+        print("  2. Install via conda: conda install -c conda-forge lightgbm")
+        print("  3. Use WSL (Windows Subsystem for Linux)")
+        print()
+        print("However, you can still test data fetching...")
+        print()
+        _check_nse_connection(symbol)
+    else:
+        print(f"❌ Import Error: {e}")
+    sys.exit(1)
+
+
+def _print_fetch_failure():
+    """Explain why no prediction came back."""
+    print("❌ Failed to fetch option chain data")
+    print()
+    print("Possible reasons:")
+    print("1. Market is closed (NSE hours: 9:15 AM - 3:30 PM IST)")
+    print("2. Network connectivity issues")
+    print("3. NSE API is temporarily unavailable")
+    print()
+    print("💡 Tip: Try again during market hours (9:15 AM - 3:30 PM IST)")
+
+
+def _fetch_with_fallback(symbol: str, safe: bool) -> Optional[Dict[str, Any]]:
+    """
+    Get a prediction from the API server if configured, else from a local model.
+    
+    Args:
+        symbol: Option symbol
+        safe: Report LightGBM import failures instead of raising them
+    
+    Returns:
+        Prediction result dictionary or None if no prediction was produced
+    """
+    server_url = os.getenv("PREDICT_API_URL")
+    if server_url:
+        import requests
+        
+        print(f"Requesting prediction for {symbol} from {server_url}...")
+        try:
+            result = fetch_from_server(server_url, symbol)
+            if result is None:
+                _print_fetch_failure()
+            return result
+        except requests.exceptions.ConnectionError:
+            print("⚠️  Prediction server not reachable, loading model locally")
+            print()
+    
+    try:
+        OptionChainPredictor = _import_predictor(safe)
+    except (ImportError, FileNotFoundError, OSError) as e:
+        if not safe:
+            raise
+        _report_import_error(e, symbol)
+    
+    # Initialize predictor
+    print("Loading model...")
+    predictor = OptionChainPredictor()
+    
+    if predictor.model is None:
+        print("⚠️  Warning: Model not loaded. Check if model files exist in models/ directory")
+        print("   Required files:")
+        print("   - lgb_model_oversampled.txt")
+        print("   - label_encoder_oversampled.joblib")
+        print("   - features_oversampled.json")
+        return None
+    
+    print("✓ Model loaded successfully")
+    print()
+    
+    # Fetch and predict
+    print(f"Fetching option chain data for {symbol}...")
+    result = predictor.fetch_and_predict(symbol)
+    if result is None:
+        _print_fetch_failure()
+    return result
+
+
+def _save_result(result: Dict[str, Any], output_file: str, pretty: bool = False):
+    """
+    Write a prediction result as JSON.
+    
+    Args:
+        result: Prediction result dictionary
+        output_file: Destination path
+        pretty: Indent the output (for reading by hand)
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(result, default=str, option=option))
+        return
+    
+    with open(output_file, 'w') as f:
+        json.dump(result, f, indent=2 if pretty else None, default=str)
+
+
+def _render_result(result: Dict[str, Any], symbol: str, pretty: bool = False):
+    """Print a prediction result and save it to a JSON file."""
+    print("✓ Data fetched successfully")
+    print()
+    
+    # Display results
+    print("=" * 60)
+    print("PREDICTION RESULTS")
+    print("=" * 60)
+    
+    if result.get('predicted_class'):
+        print(f"Predicted Class: {result['predicted_class']}")
+    else:
+        print(f"Predicted Class Index: {result.get('predicted_class_idx', 'N/A')}")
+    
+    print(f"Spot Price: ₹{result.get('spot', 'N/A'):.2f}" if result.get('spot') else "Spot Price: N/A")
+    print(f"Timestamp: {result.get('timestamp', 'N/A')}")
+    print()
+    
+    if result.get('probabilities'):
+        print("Class Probabilities:")
+        for idx, prob in enumerate(result['probabilities']):
+            print(f"  Class {idx}: {prob:.4f} ({prob*100:.2f}%)")
+        print()
+    
+    if result.get('features'):
+        print("Key Features:")
+        key_features = ['spot', 'pcr', 'total_call_oi', 'total_put_oi', 'median_iv', 'atm_strike']
+        for feat in key_features:
+            if feat in result['features']:
+                value = result['features'][feat]
+                if isinstance(value, float):
+                    print(f"  {feat}: {value:.2f}")
+                else:
+                    print(f"  {feat}: {value}")
+    
+    print("=" * 60)
+    
+    # Save to file (optional)
+    output_file = f"prediction_{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    _save_result(result, output_file, pretty)
+    print(f"\n✓ Results saved to {output_file}")
+
+
+def run(safe: bool = False):
+    """
+    Run live prediction for the symbol given on the command line.
+    
+    Args:
+        safe: Handle LightGBM import errors gracefully
+    """
+    pretty = '--pretty' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--pretty']
+    symbol = args[0] if args else "NIFTY"
+    
+    print(f"=" * 60)
+    print(f"NSE Option Chain Predictor - Live Prediction")
+    print(f"=" * 60)
+    print(f"Symbol: {symbol}")
+    print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"=" * 60)
+    print()
+    
+    try:
+        result = _fetch_with_fallback(symbol, safe)
+        if result is None:
+            return
+        
+        _render_result(result, symbol, pretty)
+    
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
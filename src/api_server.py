@@ -2,14 +2,49 @@
 FastAPI application to expose /predict endpoints.
 Optional API server for option chain predictions.
 """
+import os
+
+# One BLAS/OpenMP thread per worker process: N workers x N threads would
+# oversubscribe the CPU. Must be set before LightGBM is imported.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+import time
+import orjson
+import anyio
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 from src.fetch_predict import OptionChainPredictor
 
-app = FastAPI(title="NSE Option Chain Predictor API", version="1.0.0")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-worker startup and shutdown: threadpool size, model warm-up and the batcher."""
+    configure_threadpool()
+    # Load the model in each worker after fork so startup isn't serialized at import
+    await get_predictor()
+    start_batcher(app)
+    try:
+        yield
+    finally:
+        await stop_batcher(app)
+
+
+app = FastAPI(
+    title="NSE Option Chain Predictor API",
+    version="1.0.0",
+    lifespan=lifespan
+)
 
 # CORS middleware
 app.add_middleware(
@@ -20,8 +55,174 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize predictor
-predictor = OptionChainPredictor()
+# Response compression (small payloads like /health are left uncompressed)
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=4)
+
+# Predictor is loaded lazily per worker (after fork), not at import time
+_predictor: Optional[OptionChainPredictor] = None
+_predictor_lock = asyncio.Lock()
+
+
+async def get_predictor() -> OptionChainPredictor:
+    """Return the worker's predictor, loading it in a thread on first use."""
+    global _predictor
+    if _predictor is None:
+        async with _predictor_lock:
+            if _predictor is None:
+                _predictor = await run_in_threadpool(OptionChainPredictor)
+                HealthCheckMiddleware.body = _health_body(_predictor)
+    return _predictor
+
+
+def _health_body(predictor: Optional[OptionChainPredictor]) -> bytes:
+    """Serialize the /health payload for the current predictor state."""
+    return orjson.dumps({
+        "status": "healthy",
+        "model_loaded": predictor is not None and predictor.model is not None,
+        "features_loaded": predictor is not None and predictor.features is not None
+    })
+
+
+class HealthCheckMiddleware:
+    """
+    Pure ASGI middleware answering GET /health with a pre-built body,
+    bypassing CORS/GZip middleware, routing and response serialization.
+    The body is swapped once when the predictor finishes loading.
+    """
+    
+    body: bytes = _health_body(None)
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/health" and scope["method"] in ("GET", "HEAD"):
+            body = HealthCheckMiddleware.body
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ]
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        await self.app(scope, receive, send)
+
+
+# Registered last so it is the outermost middleware
+app.add_middleware(HealthCheckMiddleware)
+
+# Threadpool size for blocking predictor calls (NSE fetch + inference)
+THREADPOOL_SIZE = 64
+
+
+# Micro-batching: coalesce concurrent /predict calls into one model call
+MAX_BATCH = 64
+MAX_WAIT_MS = 5
+_predict_queue: Optional[asyncio.Queue] = None
+
+# Short-TTL cache for GET /predict/{symbol}: symbol -> (expires_at, result)
+PREDICTION_CACHE_TTL = 5.0
+_prediction_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+CACHE_HEADERS = {"Cache-Control": f"public, max-age={int(PREDICTION_CACHE_TTL)}"}
+
+# Pre-serialized /features body (feature list is immutable once loaded)
+_features_body: Optional[bytes] = None
+
+
+def configure_threadpool():
+    """Enlarge the anyio threadpool used for offloaded blocking calls."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+
+def start_batcher(app: FastAPI):
+    """Start the background task that drains the prediction queue."""
+    global _predict_queue
+    _predict_queue = asyncio.Queue()
+    # Keep a strong reference: the event loop only holds tasks weakly
+    app.state.batch_task = asyncio.create_task(_batch_worker(_predict_queue))
+    app.state.batch_task.add_done_callback(_on_batcher_done)
+
+
+async def stop_batcher(app: FastAPI):
+    """Cancel the batching task and wait for it to finish."""
+    task = getattr(app.state, "batch_task", None)
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+def _fail_pending(error: BaseException):
+    """Fail every request still waiting in the prediction queue."""
+    while _predict_queue is not None and not _predict_queue.empty():
+        _, fut = _predict_queue.get_nowait()
+        if not fut.done():
+            fut.set_exception(error)
+
+
+def _on_batcher_done(task: asyncio.Task):
+    """Log a crashed batcher and fail queued requests instead of leaving them hanging."""
+    if task.cancelled():
+        _fail_pending(RuntimeError("Prediction batcher stopped"))
+        return
+    error = task.exception()
+    if error is not None:
+        logger.error("Prediction batcher crashed", exc_info=error)
+        _fail_pending(RuntimeError(f"Prediction batcher crashed: {error}"))
+
+
+async def _batch_worker(queue: asyncio.Queue):
+    """
+    Collect queued (features, future) pairs for up to MAX_WAIT_MS or MAX_BATCH
+    items, run a single batched prediction, and resolve each future.
+    """
+    loop = asyncio.get_running_loop()
+    batch = []
+    try:
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + MAX_WAIT_MS / 1000
+            while len(batch) < MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                predictor = await get_predictor()
+                results = await run_in_threadpool(predictor.predict_batch, [feats for feats, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            
+            for i, (_, fut) in enumerate(batch):
+                if not fut.done():
+                    fut.set_result(results[i] if results else None)
+    finally:
+        # Requests taken off the queue but not answered when the task ends
+        for _, fut in batch:
+            if not fut.done():
+                fut.set_exception(RuntimeError("Prediction batcher stopped"))
+
+
+async def batched_predict(features: Dict[str, float]) -> Optional[Dict[str, Any]]:
+    """Submit features to the micro-batching queue and await the prediction."""
+    task = getattr(app.state, "batch_task", None)
+    if task is None or task.done():
+        raise RuntimeError("Prediction batcher is not running")
+    fut = asyncio.get_running_loop().create_future()
+    await _predict_queue.put((features, fut))
+    return await fut
 
 
 class PredictionRequest(BaseModel):
@@ -31,7 +232,7 @@ class PredictionRequest(BaseModel):
 
 
 class PredictionResponse(BaseModel):
-    """Response model for prediction endpoint."""
+    """Response model for prediction endpoint (OpenAPI docs only; responses are not validated)."""
     predicted_class: Optional[str] = None
     predicted_class_idx: int
     probabilities: list
@@ -40,6 +241,27 @@ class PredictionResponse(BaseModel):
     features: Optional[Dict[str, float]] = None
 
 
+def prediction_payload(
+    result: Dict[str, Any],
+    features: Optional[Dict[str, float]] = None,
+    spot: Optional[float] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Build a PredictionResponse-shaped body and return it already serialized
+    with orjson, skipping a second Pydantic validation pass on the response.
+    """
+    body = orjson.dumps({
+        'predicted_class': result.get('predicted_class'),
+        'predicted_class_idx': result.get('predicted_class_idx', 0),
+        'probabilities': result.get('probabilities', []),
+        'spot': spot,
+        'timestamp': result.get('timestamp', ''),
+        'features': features
+    }, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -54,17 +276,7 @@ async def root():
     }
 
 
-@app.get("/health")
-async def health():
-    """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "model_loaded": predictor.model is not None,
-        "features_loaded": predictor.features is not None
-    }
-
-
-@app.post("/predict", response_model=PredictionResponse)
+@app.post("/predict", responses={200: {"model": PredictionResponse}})
 async def predict(request: PredictionRequest):
     """
     Predict endpoint - fetches option chain and returns prediction.
@@ -78,40 +290,28 @@ async def predict(request: PredictionRequest):
     try:
         if request.features:
             # Use provided features directly
-            prediction = predictor.predict(request.features)
+            prediction = await batched_predict(request.features)
             if prediction is None:
                 raise HTTPException(status_code=500, detail="Prediction failed")
             
-            return PredictionResponse(
-                predicted_class=prediction.get('predicted_class'),
-                predicted_class_idx=prediction.get('predicted_class_idx', 0),
-                probabilities=prediction.get('probabilities', []),
-                timestamp=prediction.get('timestamp', ''),
-                features=request.features
-            )
+            return prediction_payload(prediction, features=request.features)
         else:
             # Fetch and predict
-            result = predictor.fetch_and_predict(request.symbol)
+            predictor = await get_predictor()
+            result = await run_in_threadpool(predictor.fetch_and_predict, request.symbol)
             if result is None:
                 raise HTTPException(
                     status_code=500,
                     detail=f"Failed to fetch option chain for {request.symbol}"
                 )
             
-            return PredictionResponse(
-                predicted_class=result.get('predicted_class'),
-                predicted_class_idx=result.get('predicted_class_idx', 0),
-                probabilities=result.get('probabilities', []),
-                spot=result.get('spot'),
-                timestamp=result.get('timestamp', ''),
-                features=result.get('features')
-            )
+            return prediction_payload(result, features=result.get('features'), spot=result.get('spot'))
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/predict/{symbol}", response_model=PredictionResponse)
+@app.get("/predict/{symbol}", responses={200: {"model": PredictionResponse}})
 async def predict_get(symbol: str):
     """
     Quick prediction endpoint via GET request.
@@ -123,20 +323,24 @@ async def predict_get(symbol: str):
         PredictionResponse with prediction results
     """
     try:
-        result = predictor.fetch_and_predict(symbol)
-        if result is None:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to fetch option chain for {symbol}"
-            )
+        cached = _prediction_cache.get(symbol)
+        if cached and cached[0] > time.monotonic():
+            result = cached[1]
+        else:
+            predictor = await get_predictor()
+            result = await run_in_threadpool(predictor.fetch_and_predict, symbol)
+            if result is None:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to fetch option chain for {symbol}"
+                )
+            _prediction_cache[symbol] = (time.monotonic() + PREDICTION_CACHE_TTL, result)
         
-        return PredictionResponse(
-            predicted_class=result.get('predicted_class'),
-            predicted_class_idx=result.get('predicted_class_idx', 0),
-            probabilities=result.get('probabilities', []),
+        return prediction_payload(
+            result,
+            features=result.get('features'),
             spot=result.get('spot'),
-            timestamp=result.get('timestamp', ''),
-            features=result.get('features')
+            headers=CACHE_HEADERS
         )
     
     except Exception as e:
@@ -146,13 +350,18 @@ async def predict_get(symbol: str):
 @app.get("/features")
 async def get_features():
     """Get list of features used by the model."""
+    global _features_body
+    predictor = await get_predictor()
     if predictor.features is None:
         raise HTTPException(status_code=404, detail="Features not loaded")
     
-    return {
-        "features": predictor.features,
-        "count": len(predictor.features)
-    }
+    if _features_body is None:
+        _features_body = orjson.dumps({
+            "features": predictor.features,
+            "count": len(predictor.features)
+        })
+    
+    return Response(content=_features_body, media_type="application/json", headers=CACHE_HEADERS)
 
 
 if __name__ == "__main__":
@@ -162,10 +371,24 @@ if __name__ == "__main__":
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
     
     args = parser.parse_args()
     
-    uvicorn.run(app, host=args.host, port=args.port, reload=args.reload)
+    # "auto" picks uvloop + httptools (from uvicorn[standard]) when they are
+    # importable and falls back to asyncio + h11 otherwise (uvloop has no
+    # Windows build). Reload/multi-worker modes need an import string instead
+    # of the app object.
+    target = "src.api_server:app" if (args.reload or args.workers > 1) else app
+    uvicorn.run(
+        target,
+        host=args.host,
+        port=args.port,
+        loop="auto",
+        http="auto",
+        reload=args.reload,
+        workers=None if args.reload else args.workers
+    )
 
 
 
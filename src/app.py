@@ -3,12 +3,51 @@ Streamlit dashboard (disk-backed version): reads aggregated files.
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+import orjson
 from pathlib import Path
 from datetime import datetime
+from typing import Optional, Tuple
 import glob
+import json
+import sys
 
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils import downsample_lttb
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements
+    pa = None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+
+# Serialize figures with orjson (native NumPy/datetime64 support)
+pio.json.config.default_engine = 'orjson'
+PLOTLY_CONFIG = {'staticPlot': False, 'responsive': True}
+
+# Plot limits: downsample target per trace and WebGL switch-over
+MAX_PLOT_POINTS = 2000
+WEBGL_THRESHOLD = 1000
+
+# Columns needed by the Overview tab
+OVERVIEW_COLUMNS = ('timestamp', 'symbol', 'spot', 'pcr')
+
+# Subdirectory of the data dir holding the compacted snapshot cache
+COMPACT_CACHE_DIR = "_cache"
 
 # Page config
 st.set_page_config(
@@ -18,44 +57,185 @@ st.set_page_config(
 )
 
 
-def load_aggregated_data(data_dir: str = "data/processed") -> pd.DataFrame:
+def _scan_parquet_dataset(parquet_files: list) -> "pa.Table":
     """
-    Load all aggregated snapshot files.
+    Scan parquet files as one Arrow dataset.
+    
+    Args:
+        parquet_files: List of parquet file paths
+        
+    Returns:
+        Combined Arrow table
+    """
+    # Snapshot files may differ in columns/int-vs-float types; unify from footers only
+    schema = pa.unify_schemas(
+        [pq.read_schema(f) for f in parquet_files],
+        promote_options="permissive"
+    ).remove_metadata()
+    return ds.dataset([str(f) for f in parquet_files], format="parquet", schema=schema).to_table()
+
+
+def _normalize_timestamps(table: "pa.Table") -> "pa.Table":
+    """Store the timestamp column as an Arrow timestamp instead of strings."""
+    if 'timestamp' not in table.column_names or pa.types.is_timestamp(table.schema.field('timestamp').type):
+        return table
+    timestamps = pd.to_datetime(table.column('timestamp').to_pandas())
+    idx = table.column_names.index('timestamp')
+    return table.set_column(idx, 'timestamp', pa.array(timestamps, type=pa.timestamp('us')))
+
+
+def _load_compacted(
+    data_path: Path,
+    parquet_files: list,
+    columns: Optional[Tuple[str, ...]] = None
+) -> Optional[pd.DataFrame]:
+    """
+    Load snapshots through a single compacted parquet file kept in
+    ``<data_dir>/_cache``. A manifest of source file mtimes decides whether the
+    compacted file can be read as-is, extended with new files, or rebuilt.
+    
+    Args:
+        data_path: Directory containing processed data files
+        parquet_files: List of source parquet files
+        columns: Optional columns to read (None = all)
+        
+    Returns:
+        Arrow-backed DataFrame, or None if loading fails
+    """
+    cache_dir = data_path / COMPACT_CACHE_DIR
+    compacted_file = cache_dir / "compacted.parquet"
+    manifest_file = cache_dir / "manifest.json"
+    
+    try:
+        current = {f.name: f.stat().st_mtime for f in parquet_files}
+        cached = {}
+        if compacted_file.exists() and manifest_file.exists():
+            with open(manifest_file, 'r') as f:
+                cached = json.load(f)
+        
+        if cached and cached == current:
+            # Column pruning: only decode the requested columns
+            if columns is not None:
+                names = pq.read_schema(compacted_file).names
+                table = pq.read_table(compacted_file, columns=[c for c in columns if c in names])
+            else:
+                table = pq.read_table(compacted_file)
+        else:
+            unchanged = bool(cached) and all(current.get(name) == mtime for name, mtime in cached.items())
+            if unchanged:
+                # Only new snapshots landed: append them to the compacted table
+                new_files = [f for f in parquet_files if f.name not in cached]
+                table = pa.concat_tables(
+                    [pq.read_table(compacted_file)] + [_normalize_timestamps(pq.read_table(f)) for f in new_files],
+                    promote_options="permissive"
+                )
+            else:
+                table = _scan_parquet_dataset(parquet_files)
+            
+            # Typed + sorted timestamps give row groups tight min/max statistics,
+            # so time-window reads can skip whole row groups
+            table = _normalize_timestamps(table)
+            if 'timestamp' in table.column_names:
+                table = table.sort_by('timestamp')
+            
+            try:
+                cache_dir.mkdir(exist_ok=True)
+                pq.write_table(table, compacted_file, compression='zstd', row_group_size=100000)
+                with open(manifest_file, 'w') as f:
+                    json.dump(current, f)
+            except OSError as e:
+                st.warning(f"Could not write compacted cache: {e}")
+            
+            if columns is not None:
+                table = table.select([c for c in columns if c in table.column_names])
+        
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    except Exception as e:
+        st.warning(f"Dataset scan failed, falling back to per-file reads: {e}")
+        return None
+
+
+def _list_and_stamp(data_dir: str) -> Tuple[Tuple[str, ...], float]:
+    """
+    List aggregated snapshot files and the latest modification time.
     
     Args:
         data_dir: Directory containing processed data files
         
     Returns:
-        Combined DataFrame
+        Tuple of (file paths, max mtime) - empty tuple if no files
     """
     data_path = Path(data_dir)
     if not data_path.exists():
-        return pd.DataFrame()
+        return (), 0.0
     
-    # Load parquet files
-    parquet_files = list(data_path.glob("*.parquet"))
-    csv_files = list(data_path.glob("*.csv"))
+    # Prefer parquet files, fall back to CSV
+    files = sorted(data_path.glob("*.parquet")) or sorted(data_path.glob("*.csv"))
+    if not files:
+        return (), 0.0
     
-    files = parquet_files if parquet_files else csv_files
+    stamp = max(f.stat().st_mtime for f in files)
+    return tuple(str(f) for f in files), stamp
+
+
+@st.cache_data(show_spinner=False)
+def _column_schema(files: Tuple[str, ...], stamp: float) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Column names and numeric column names across snapshot files, read from
+    parquet footers without decoding any data.
     
-    if not files:
-        return pd.DataFrame()
+    Returns:
+        Tuple of (all columns, numeric columns)
+    """
+    paths = [Path(f) for f in files]
+    if pa is not None and all(f.suffix == '.parquet' for f in paths):
+        schema = pa.unify_schemas([pq.read_schema(f) for f in paths], promote_options="permissive")
+        numeric = [
+            field.name for field in schema
+            if pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+        ]
+        return tuple(schema.names), tuple(numeric)
     
-    dfs = []
-    for file in files:
-        try:
-            if file.suffix == '.parquet':
-                df = pd.read_parquet(file)
-            else:
-                df = pd.read_csv(file)
-            dfs.append(df)
-        except Exception as e:
-            st.warning(f"Error loading {file.name}: {e}")
+    data = _load_cached(files, stamp)
+    return tuple(data.columns), tuple(data.select_dtypes(include='number').columns)
+
+
+@st.cache_data(show_spinner=False)
+def _load_cached(
+    files: Tuple[str, ...],
+    stamp: float,
+    columns: Optional[Tuple[str, ...]] = None
+) -> pd.DataFrame:
+    """
+    Load and combine snapshot files. Cached on (files, stamp, columns) so the
+    data is only re-read when a snapshot is added or modified, not on every
+    rerun, and only the requested columns are decoded.
+    """
+    paths = [Path(f) for f in files]
+    parquet_files = [f for f in paths if f.suffix == '.parquet']
     
-    if not dfs:
-        return pd.DataFrame()
+    data = None
+    if parquet_files and pa is not None:
+        data = _load_compacted(parquet_files[0].parent, parquet_files, columns)
     
-    data = pd.concat(dfs, ignore_index=True)
+    if data is None:
+        dfs = []
+        for file in paths:
+            try:
+                if file.suffix == '.parquet':
+                    df = pd.read_parquet(file)
+                else:
+                    df = pd.read_csv(file)
+                if columns is not None:
+                    df = df[[c for c in columns if c in df.columns]]
+                dfs.append(df)
+            except Exception as e:
+                st.warning(f"Error loading {file.name}: {e}")
+        
+        if not dfs:
+            return pd.DataFrame()
+        
+        data = pd.concat(dfs, ignore_index=True)
     
     # Ensure timestamp is datetime
     if 'timestamp' in data.columns:
@@ -65,6 +245,365 @@ def load_aggregated_data(data_dir: str = "data/processed") -> pd.DataFrame:
     return data
 
 
+def load_aggregated_data(data_dir: str = "data/processed") -> pd.DataFrame:
+    """
+    Load all aggregated snapshot files.
+    
+    Args:
+        data_dir: Directory containing processed data files
+        
+    Returns:
+        Combined DataFrame
+    """
+    files, stamp = _list_and_stamp(data_dir)
+    if not files:
+        return pd.DataFrame()
+    return _load_cached(files, stamp)
+
+
+def _null_counts(data: pd.DataFrame) -> dict:
+    """
+    Per-column missing-value counts without materializing a boolean frame.
+    Arrow-backed columns are counted on their validity bitmaps.
+    
+    Args:
+        data: Input DataFrame
+        
+    Returns:
+        Dictionary of column -> missing count
+    """
+    counts = {}
+    for col in data.columns:
+        series = data[col]
+        if pa is not None and isinstance(series.dtype, pd.ArrowDtype):
+            arr = series.array.__arrow_array__()
+            counts[col] = pc.sum(pc.is_null(arr, nan_is_null=True)).as_py() or 0
+        else:
+            counts[col] = int(series.isna().to_numpy().sum())
+    return counts
+
+
+def _compact_numeric(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Numeric columns as float32, without constant or all-NaN columns.
+    
+    Args:
+        data: Input DataFrame
+        
+    Returns:
+        Downcast numeric DataFrame
+    """
+    numeric_data = data.select_dtypes(include='number').astype('float32')
+    nunique = numeric_data.nunique()
+    return numeric_data.loc[:, nunique > 1]
+
+
+@st.cache_resource(show_spinner=False)
+def _summary_tables(files: Tuple[str, ...], stamp: float, _numeric_data: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Compute describe() and correlation tables for the Statistics tab.
+    Keyed on the same (files, stamp) as the loaded data.
+    """
+    if pl is not None:
+        # Multi-threaded columnar describe; shaped like pandas describe()
+        summary = (
+            pl.from_pandas(_numeric_data).describe().to_pandas()
+            .set_index('statistic')
+            .drop(index='null_count')
+        )
+    else:
+        summary = _numeric_data.describe()
+    
+    # pandas corr keeps pairwise-complete semantics for sparse snapshot columns
+    corr = _numeric_data.corr() if len(_numeric_data.columns) > 1 else pd.DataFrame()
+    return summary, corr
+
+
+# Figures are cached as serialized JSON: reruns skip both figure construction
+# and Plotly's (expensive) NumPy/datetime JSON encoding.
+
+def _compacted_path(files: Tuple[str, ...]) -> Path:
+    """Path of the compacted snapshot cache for a set of data files."""
+    return Path(files[0]).parent / COMPACT_CACHE_DIR / "compacted.parquet"
+
+
+@st.cache_data(show_spinner=False)
+def _time_bounds(files: Tuple[str, ...], stamp: float) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    First/last timestamp, read from compacted row-group statistics when
+    available (no data decoded), otherwise from the timestamp column.
+    """
+    compacted_file = _compacted_path(files)
+    if pa is not None and compacted_file.exists():
+        metadata = pq.ParquetFile(compacted_file).metadata
+        names = metadata.schema.to_arrow_schema().names
+        if 'timestamp' in names and metadata.num_row_groups > 0:
+            col = names.index('timestamp')
+            stats = [metadata.row_group(i).column(col).statistics for i in range(metadata.num_row_groups)]
+            if all(s is not None and s.has_min_max for s in stats):
+                return min(s.min for s in stats), max(s.max for s in stats)
+    
+    data = _load_cached(files, stamp, ('timestamp',))
+    timestamps = data['timestamp'].dropna() if 'timestamp' in data.columns else pd.Series(dtype=object)
+    if timestamps.empty:
+        return None, None
+    return timestamps.min().to_pydatetime(), timestamps.max().to_pydatetime()
+
+
+@st.cache_data(show_spinner=False, ttl=300)
+def _load_window(
+    files: Tuple[str, ...],
+    stamp: float,
+    columns: Tuple[str, ...],
+    start: Optional[datetime],
+    end: Optional[datetime]
+) -> pd.DataFrame:
+    """
+    Load columns for a time window. Against the compacted cache the filter is
+    pushed down, so only row groups overlapping the window are read.
+    """
+    compacted_file = _compacted_path(files)
+    if pa is not None and start is not None and compacted_file.exists():
+        dataset = ds.dataset(str(compacted_file), format="parquet")
+        names = dataset.schema.names
+        window = (ds.field('timestamp') >= pa.scalar(start, pa.timestamp('us'))) & \
+                 (ds.field('timestamp') <= pa.scalar(end, pa.timestamp('us')))
+        table = dataset.to_table(columns=[c for c in columns if c in names], filter=window)
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    
+    data = _load_cached(files, stamp, columns)
+    if start is not None:
+        data = data[(data['timestamp'] >= start) & (data['timestamp'] <= end)]
+    return data
+
+
+@st.cache_data(show_spinner=False)
+def _time_series_figure(
+    files: Tuple[str, ...],
+    stamp: float,
+    metrics: Tuple[str, ...],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> str:
+    """Build the Time Series figure for the selected metrics as JSON."""
+    data = _load_window(files, stamp, ('timestamp', *metrics), start, end)
+    fig = go.Figure()
+    
+    for metric in metrics:
+        series = data[['timestamp', metric]].dropna()
+        timestamps = series['timestamp'].to_numpy()
+        values = series[metric].to_numpy(dtype='float64')
+        
+        # LTTB keeps the visual shape with far fewer points for the browser
+        keep = downsample_lttb(timestamps.astype('int64'), values, MAX_PLOT_POINTS)
+        scatter = go.Scattergl if len(keep) > WEBGL_THRESHOLD else go.Scatter
+        fig.add_trace(scatter(
+            x=timestamps[keep],
+            y=values[keep].astype('float32'),
+            mode='lines',
+            name=metric
+        ))
+    
+    fig.update_layout(
+        title="Time Series Plot",
+        xaxis_title="Timestamp",
+        yaxis_title="Value",
+        hovermode='x unified'
+    )
+    return fig.to_json()
+
+
+@st.cache_data(show_spinner=False)
+def _histogram_figure(files: Tuple[str, ...], stamp: float, feature: str) -> str:
+    """Build the pre-binned distribution figure for a feature as JSON."""
+    data = _load_cached(files, stamp, ('timestamp', feature))
+    
+    # Bin once with NumPy and plot pre-binned bars
+    values = data[feature].dropna().to_numpy(dtype='float32')
+    counts, edges = np.histogram(values, bins=50)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges)
+    ))
+    fig.update_layout(
+        title=f"{feature} Distribution",
+        xaxis_title=feature,
+        yaxis_title="count",
+        bargap=0
+    )
+    return fig.to_json()
+
+
+@st.cache_data(show_spinner=False)
+def _feature_scatter_figure(files: Tuple[str, ...], stamp: float, feature: str) -> str:
+    """Build the feature-over-time scatter figure as JSON."""
+    data = _load_cached(files, stamp, ('timestamp', feature))
+    fig = px.scatter(
+        x=data['timestamp'].to_numpy(),
+        y=data[feature].to_numpy(dtype='float32', na_value=np.nan),
+        labels={'x': 'timestamp', 'y': feature},
+        title=f"{feature} Over Time"
+    )
+    return fig.to_json()
+
+
+@st.cache_data(show_spinner=False)
+def _correlation_figure(files: Tuple[str, ...], stamp: float, _corr: pd.DataFrame) -> str:
+    """Build the correlation heatmap as JSON (keyed on the loaded data)."""
+    fig = px.imshow(_corr, text_auto=True, aspect="auto", title="Feature Correlation")
+    return fig.to_json()
+
+
+@st.cache_data(show_spinner=False)
+def _overview_meta(files: Tuple[str, ...], stamp: float) -> dict:
+    """
+    Overview metrics computed once per data version. Data is sorted by
+    timestamp (missing timestamps last), so first/last reads are O(1).
+    """
+    data = _load_cached(files, stamp, OVERVIEW_COLUMNS)
+    meta = {'num_rows': len(data)}
+    
+    if 'timestamp' in data.columns:
+        timestamps = data['timestamp']
+        ts_max = timestamps.iat[-1]
+        if pd.isna(ts_max):
+            ts_max = timestamps.dropna().iat[-1] if timestamps.notna().any() else None
+        meta['ts_min'] = timestamps.iat[0] if ts_max is not None else None
+        meta['ts_max'] = ts_max
+    
+    if 'symbol' in data.columns:
+        meta['symbols'] = [str(s) for s in pd.unique(data['symbol'].dropna().to_numpy())]
+    
+    if 'spot' in data.columns and len(data) > 0:
+        latest_spot = data['spot'].iat[-1]
+        meta['latest_spot'] = None if pd.isna(latest_spot) else float(latest_spot)
+    
+    return meta
+
+
+@st.fragment
+def render_overview(data: pd.DataFrame, meta: dict):
+    """Overview tab: headline metrics and recent snapshots."""
+    st.header("Data Overview")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total Snapshots", meta['num_rows'])
+    
+    with col2:
+        if meta.get('ts_min') is not None:
+            date_range = f"{meta['ts_min'].date()} to {meta['ts_max'].date()}"
+            st.metric("Date Range", date_range)
+    
+    with col3:
+        if 'symbols' in meta:
+            st.metric("Symbols", ", ".join(meta['symbols']))
+    
+    with col4:
+        if 'latest_spot' in meta:
+            latest_spot = meta['latest_spot']
+            st.metric("Latest Spot", f"₹{latest_spot:.2f}" if latest_spot else "N/A")
+    
+    # Display recent data
+    st.subheader("Recent Snapshots")
+    display_cols = ['timestamp', 'symbol', 'spot', 'pcr']
+    available_cols = [col for col in display_cols if col in data.columns]
+    st.dataframe(data[available_cols].tail(20), use_container_width=True)
+
+
+@st.fragment
+def render_time_series(files: Tuple[str, ...], stamp: float):
+    """Time Series tab: multi-metric line plot."""
+    st.header("Time Series Analysis")
+    
+    all_cols, numeric_cols = _column_schema(files, stamp)
+    if 'timestamp' not in all_cols:
+        st.warning("Timestamp column not found")
+        return
+    
+    # Select metrics to plot
+    exclude_cols = ['predicted_class_idx']
+    plot_cols = [col for col in numeric_cols if col not in exclude_cols]
+    
+    selected_metrics = st.multiselect(
+        "Select metrics to plot",
+        plot_cols,
+        default=['spot', 'pcr'] if 'spot' in plot_cols and 'pcr' in plot_cols else plot_cols[:2]
+    )
+    
+    if selected_metrics:
+        start, end = _time_bounds(files, stamp)
+        if start is not None and start < end:
+            start, end = st.slider(
+                "Time window",
+                min_value=start,
+                max_value=end,
+                value=(start, end),
+                format="YYYY-MM-DD HH:mm"
+            )
+        
+        fig_json = _time_series_figure(files, stamp, tuple(selected_metrics), start, end)
+        st.plotly_chart(orjson.loads(fig_json), use_container_width=True, config=PLOTLY_CONFIG)
+
+
+@st.fragment
+def render_features(files: Tuple[str, ...], stamp: float):
+    """Features tab: per-feature distribution and statistics."""
+    st.header("Feature Analysis")
+    
+    # Feature distribution
+    _, numeric_cols = _column_schema(files, stamp)
+    
+    selected_feature = st.selectbox("Select feature", numeric_cols)
+    
+    if selected_feature:
+        data = _load_cached(files, stamp, ('timestamp', selected_feature))
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("Distribution")
+            fig_json = _histogram_figure(files, stamp, selected_feature)
+            st.plotly_chart(orjson.loads(fig_json), use_container_width=True, config=PLOTLY_CONFIG)
+        
+        with col2:
+            st.subheader("Statistics")
+            stats = data[selected_feature].describe()
+            st.dataframe(stats.to_frame().T, use_container_width=True)
+            
+            if 'timestamp' in data.columns:
+                fig_json = _feature_scatter_figure(files, stamp, selected_feature)
+                st.plotly_chart(orjson.loads(fig_json), use_container_width=True, config=PLOTLY_CONFIG)
+
+
+@st.fragment
+def render_statistics(files: Tuple[str, ...], stamp: float):
+    """Statistics tab: summary, correlation and missing values."""
+    st.header("Statistics")
+    
+    # Needs every column
+    data = _load_cached(files, stamp)
+    
+    st.subheader("Summary Statistics")
+    numeric_data = _compact_numeric(data)
+    summary, corr = _summary_tables(files, stamp, numeric_data)
+    st.dataframe(summary, use_container_width=True)
+    
+    st.subheader("Correlation Matrix")
+    if len(numeric_data.columns) > 1:
+        fig_json = _correlation_figure(files, stamp, _corr=corr)
+        st.plotly_chart(orjson.loads(fig_json), use_container_width=True, config=PLOTLY_CONFIG)
+    
+    st.subheader("Missing Values")
+    missing = {col: count for col, count in _null_counts(data).items() if count > 0}
+    missing_df = pd.DataFrame({'Count': pd.Series(missing, dtype='int64')})
+    if not missing_df.empty:
+        st.dataframe(missing_df, use_container_width=True)
+    else:
+        st.info("No missing values found")
+
+
 def main():
     st.title("📈 NSE Option Chain Predictor Dashboard")
     st.markdown("Disk-backed version: reads aggregated snapshot files")
@@ -73,11 +612,12 @@ def main():
     st.sidebar.header("Configuration")
     data_dir = st.sidebar.text_input("Data Directory", value="data/processed")
     
-    # Load data
+    # Load data (overview columns only; tabs load what they plot)
     with st.spinner("Loading aggregated data..."):
-        data = load_aggregated_data(data_dir)
+        files, stamp = _list_and_stamp(data_dir)
+        data = _load_cached(files, stamp, OVERVIEW_COLUMNS) if files else pd.DataFrame()
     
-    if data.empty:
+    if not files or len(data) == 0:
         st.warning(f"No data found in {data_dir}. Run collector.py to collect data.")
         st.stop()
     
@@ -87,118 +627,16 @@ def main():
     tab1, tab2, tab3, tab4 = st.tabs(["Overview", "Time Series", "Features", "Statistics"])
     
     with tab1:
-        st.header("Data Overview")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("Total Snapshots", len(data))
-        
-        with col2:
-            if 'timestamp' in data.columns:
-                date_range = f"{data['timestamp'].min().date()} to {data['timestamp'].max().date()}"
-                st.metric("Date Range", date_range)
-        
-        with col3:
-            if 'symbol' in data.columns:
-                symbols = data['symbol'].unique()
-                st.metric("Symbols", ", ".join(symbols))
-        
-        with col4:
-            if 'spot' in data.columns:
-                latest_spot = data['spot'].iloc[-1] if len(data) > 0 else None
-                st.metric("Latest Spot", f"₹{latest_spot:.2f}" if latest_spot else "N/A")
-        
-        # Display recent data
-        st.subheader("Recent Snapshots")
-        display_cols = ['timestamp', 'symbol', 'spot', 'pcr']
-        available_cols = [col for col in display_cols if col in data.columns]
-        st.dataframe(data[available_cols].tail(20), use_container_width=True)
+        render_overview(data, _overview_meta(files, stamp))
     
     with tab2:
-        st.header("Time Series Analysis")
-        
-        if 'timestamp' not in data.columns:
-            st.warning("Timestamp column not found")
-            st.stop()
-        
-        # Select metrics to plot
-        numeric_cols = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-        exclude_cols = ['predicted_class_idx']
-        plot_cols = [col for col in numeric_cols if col not in exclude_cols]
-        
-        selected_metrics = st.multiselect(
-            "Select metrics to plot",
-            plot_cols,
-            default=['spot', 'pcr'] if 'spot' in plot_cols and 'pcr' in plot_cols else plot_cols[:2]
-        )
-        
-        if selected_metrics:
-            fig = go.Figure()
-            
-            for metric in selected_metrics:
-                fig.add_trace(go.Scatter(
-                    x=data['timestamp'],
-                    y=data[metric],
-                    mode='lines',
-                    name=metric
-                ))
-            
-            fig.update_layout(
-                title="Time Series Plot",
-                xaxis_title="Timestamp",
-                yaxis_title="Value",
-                hovermode='x unified'
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        render_time_series(files, stamp)
     
     with tab3:
-        st.header("Feature Analysis")
-        
-        # Feature distribution
-        numeric_cols = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-        
-        selected_feature = st.selectbox("Select feature", numeric_cols)
-        
-        if selected_feature:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("Distribution")
-                fig = px.histogram(data, x=selected_feature, nbins=50, title=f"{selected_feature} Distribution")
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                st.subheader("Statistics")
-                stats = data[selected_feature].describe()
-                st.dataframe(stats.to_frame().T, use_container_width=True)
-                
-                if 'timestamp' in data.columns:
-                    fig = px.scatter(data, x='timestamp', y=selected_feature, 
-                                   title=f"{selected_feature} Over Time")
-                    st.plotly_chart(fig, use_container_width=True)
+        render_features(files, stamp)
     
     with tab4:
-        st.header("Statistics")
-        
-        st.subheader("Summary Statistics")
-        numeric_data = data.select_dtypes(include=['float64', 'int64'])
-        st.dataframe(numeric_data.describe(), use_container_width=True)
-        
-        st.subheader("Correlation Matrix")
-        if len(numeric_data.columns) > 1:
-            corr = numeric_data.corr()
-            fig = px.imshow(corr, text_auto=True, aspect="auto", title="Feature Correlation")
-            st.plotly_chart(fig, use_container_width=True)
-        
-        st.subheader("Missing Values")
-        missing = data.isnull().sum()
-        missing_df = missing[missing > 0].to_frame('Count')
-        if not missing_df.empty:
-            st.dataframe(missing_df, use_container_width=True)
-        else:
-            st.info("No missing values found")
+        render_statistics(files, stamp)
 
 
 if __name__ == "__main__":
@@ -5,10 +5,9 @@ Modern UI with comprehensive features and visualizations.
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import time
+from datetime import datetime, timedelta, time as dt_time
+from collections import deque
+from itertools import islice
 import sys
 from pathlib import Path
 
@@ -58,27 +57,164 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Cap on in-session prediction history; oldest entries are dropped first
+MAX_HISTORY = 500
+
+# NSE trading session (IST)
+MARKET_OPEN = dt_time(9, 15)
+MARKET_CLOSE = dt_time(15, 30)
+
+
+@st.cache_resource(show_spinner="Loading model...")
+def get_predictor() -> OptionChainPredictor:
+    """Load the predictor once per process and share it across sessions."""
+    return OptionChainPredictor()
+
+
 # Initialize session state
 if 'predictor' not in st.session_state:
-    with st.spinner("Loading model..."):
-        st.session_state.predictor = OptionChainPredictor()
+    st.session_state.predictor = get_predictor()
     st.session_state.monitor = None
-    st.session_state.predictions_history = []
+    st.session_state.predictions_history = deque(maxlen=MAX_HISTORY)
     st.session_state.auto_refresh = False
     st.session_state.refresh_interval = 30
+    st.session_state.last_fetch_at = None
+
+
+# (threshold, suffix) pairs, largest first, used by format_number
+_SUFFIXES = ((1e9, 'B'), (1e6, 'M'), (1e3, 'K'))
 
 
 def format_number(value):
     """Format large numbers with K, M suffixes."""
-    if value is None or pd.isna(value):
+    if value is None or value != value:
         return "N/A"
-    if value >= 1e9:
-        return f"{value/1e9:.2f}B"
-    elif value >= 1e6:
-        return f"{value/1e6:.2f}M"
-    elif value >= 1e3:
-        return f"{value/1e3:.2f}K"
-    return f"{value:.2f}"
+    divisor, suffix = next(((t, s) for t, s in _SUFFIXES if value >= t), (1, ''))
+    return f"{value/divisor:.2f}{suffix}"
+
+
+@st.cache_data(ttl=3, show_spinner=False)
+def fetch_raw_chain(symbol):
+    """
+    Fetch the raw NSE option chain, shared across sessions for a few seconds.
+    
+    NSE refreshes roughly every 3s, so rapid clicks and overlapping
+    auto-refresh ticks reuse one response instead of re-requesting it.
+    """
+    return get_predictor().fetch_option_chain(symbol)
+
+
+def run_prediction(symbol):
+    """Fetch option chain, predict, and append the result to history."""
+    st.session_state.last_fetch_at = datetime.now()
+    with st.spinner("Fetching option chain data and making prediction..."):
+        result = st.session_state.predictor.predict_from_raw(fetch_raw_chain(symbol))
+        
+        if result:
+            # datetime64 so the analytics frame needs no per-row parsing
+            result['timestamp'] = np.datetime64(datetime.now())
+            result['symbol'] = symbol
+            st.session_state.predictions_history.append(result)
+            st.success("✅ Prediction successful!")
+        else:
+            st.error("❌ Failed to fetch data. Market may be closed or API unavailable.")
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def build_history_views(n_rows, first_ts, last_ts, num_classes, _history):
+    """
+    Build the analytics views for the prediction history.
+    
+    Cached on the history length and its first/last timestamps, so reruns
+    that did not add a prediction skip the DataFrame rebuild and sort. Only
+    the latest key is ever read back, so just a few entries are kept.
+    
+    Args:
+        n_rows: Number of entries in the history
+        first_ts: Timestamp of the oldest entry
+        last_ts: Timestamp of the newest entry
+        num_classes: Number of model classes (classes never predicted count as 0)
+        _history: Prediction history (excluded from the cache key)
+    
+    Returns:
+        Tuple of (history sorted by timestamp, class counts, spot mean/min/max)
+    """
+    history_df = pd.DataFrame(list(_history))
+    
+    if 'timestamp' in history_df.columns:
+        history_df = history_df.sort_values('timestamp')
+    
+    pred_counts = None
+    if 'predicted_class_idx' in history_df.columns:
+        class_idx = history_df['predicted_class_idx'].dropna().to_numpy(dtype=np.int64)
+        pred_counts = np.bincount(class_idx, minlength=num_classes)
+    
+    spot_stats = None
+    if 'spot' in history_df.columns:
+        spot_stats = history_df['spot'].agg(['mean', 'min', 'max'])
+    
+    return history_df, pred_counts, spot_stats
+
+
+# Chart inputs change with every new snapshot (the monitor adds one per tick),
+# so keep only the most recent figures instead of one per tick forever
+@st.cache_data(show_spinner=False, max_entries=32)
+def make_spot_line_fig(timestamps, spots, title, x_label='timestamp', y_label='spot'):
+    """
+    Build a spot-price line chart.
+    
+    Args:
+        timestamps: Tuple of timestamps
+        spots: Tuple of spot prices
+        title: Chart title
+        x_label: X-axis label
+        y_label: Y-axis label
+    
+    Returns:
+        Plotly figure
+    """
+    import plotly.express as px
+    
+    fig = px.line(
+        x=list(timestamps),
+        y=list(spots),
+        title=title,
+        labels={'x': x_label, 'y': y_label},
+        markers=True
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def make_distribution_fig(class_indices, counts):
+    """
+    Build the prediction class distribution pie chart.
+    
+    Args:
+        class_indices: Tuple of predicted class indices
+        counts: Tuple of counts per class
+    
+    Returns:
+        Plotly figure
+    """
+    import plotly.express as px
+    
+    return px.pie(
+        values=list(counts),
+        names=[f"Class {i}" for i in class_indices],
+        title="Prediction Class Distribution"
+    )
+
+
+def refresh_due():
+    """Check whether the auto-refresh interval has elapsed since the last fetch."""
+    last = st.session_state.last_fetch_at
+    if last is None:
+        return True
+    # Allow a second of slack so a fragment tick is not skipped by jitter
+    elapsed = (datetime.now() - last).total_seconds()
+    return elapsed >= st.session_state.refresh_interval - 1
 
 
 def create_prediction_card(result):
@@ -97,6 +233,160 @@ def create_prediction_card(result):
     return card_html
 
 
+def live_prediction_panel(symbol):
+    """
+    Render the fetch controls and latest prediction.
+    
+    Run as a fragment so auto-refresh ticks rerun only this panel and not
+    the analytics and monitor tabs.
+    
+    Args:
+        symbol: Option chain symbol to fetch
+    """
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        col_fetch, col_clear = st.columns([3, 1])
+        
+        with col_fetch:
+            if st.button("🔄 Fetch & Predict", type="primary", use_container_width=True):
+                run_prediction(symbol)
+            elif st.session_state.auto_refresh and refresh_due():
+                run_prediction(symbol)
+        
+        with col_clear:
+            if st.button("🗑️ Clear History", use_container_width=True):
+                st.session_state.predictions_history.clear()
+                st.rerun()
+    
+    with col2:
+        if st.session_state.predictions_history:
+            latest = st.session_state.predictions_history[-1]
+            st.markdown(create_prediction_card(latest), unsafe_allow_html=True)
+    
+    # Display latest prediction details
+    if st.session_state.predictions_history:
+        latest = st.session_state.predictions_history[-1]
+        
+        st.subheader("📊 Prediction Details")
+        
+        # Key metrics: (label, value, format string or formatter)
+        features = latest.get('features') or {}
+        specs = [
+            ("Spot Price", latest.get('spot'), "₹{:.2f}"),
+            ("PCR", features.get('pcr'), "{:.2f}"),
+            ("Call OI", features.get('total_call_oi'), format_number),
+            ("Put OI", features.get('total_put_oi'), format_number),
+        ]
+        
+        for col, (label, value, fmt) in zip(st.columns(len(specs)), specs):
+            if value:
+                with col:
+                    st.metric(label, fmt(value) if callable(fmt) else fmt.format(value))
+        
+        # Probabilities chart
+        if latest.get('probabilities'):
+            st.subheader("🎲 Prediction Probabilities")
+            probabilities = latest['probabilities']
+            st.bar_chart(
+                pd.Series(probabilities, index=[f"Class {i}" for i in range(len(probabilities))], name="Probability"),
+                x_label="Predicted Class",
+                y_label="Probability",
+                height=400
+            )
+        
+        # Features table
+        if features:
+            st.subheader("🔍 Feature Values")
+            key_features = {
+                'Spot Price': features.get('spot'),
+                'PCR': features.get('pcr'),
+                'ATM Strike': features.get('atm_strike'),
+                'Max OI Strike': features.get('max_oi_strike'),
+                'Total Call OI': features.get('total_call_oi'),
+                'Total Put OI': features.get('total_put_oi'),
+                'Median CE IV': features.get('median_ce_iv'),
+                'Median PE IV': features.get('median_pe_iv'),
+                'Median Volume': features.get('median_volume'),
+                'OI Skew': features.get('oi_skew_mean'),
+            }
+            
+            features_df = pd.DataFrame({
+                'Feature': list(key_features.keys()),
+                'Value': [v if v is not None else 'N/A' for v in key_features.values()]
+            })
+            st.dataframe(features_df, use_container_width=True, hide_index=True)
+    
+    else:
+        st.info("👆 Click 'Fetch & Predict' to get your first prediction")
+
+
+def monitor_due(monitor):
+    """Check whether the monitor's fetch interval has elapsed since its last snapshot."""
+    latest = monitor.get_latest()
+    if latest is None:
+        return True
+    elapsed = (datetime.now() - datetime.fromisoformat(latest['timestamp'])).total_seconds()
+    return elapsed >= monitor.interval - 1
+
+
+def monitor_view():
+    """
+    Collect and render the real-time monitor's statistics and snapshots.
+    
+    Run as a fragment that ticks at the monitor interval while it is
+    running, so new snapshots rerun only this view.
+    """
+    monitor = st.session_state.monitor
+    if monitor.running and monitor_due(monitor):
+        monitor.run_once()
+    
+    stats = monitor.get_statistics()
+    if stats:
+        st.subheader("📊 Monitor Statistics")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Snapshots", stats.get('total_snapshots', 0))
+        with col2:
+            if stats.get('spot_mean'):
+                st.metric("Avg Spot", f"₹{stats['spot_mean']:.2f}")
+        with col3:
+            if stats.get('spot_min') and stats.get('spot_max'):
+                st.metric("Spot Range", f"₹{stats['spot_min']:.2f} - ₹{stats['spot_max']:.2f}")
+        
+        # Recent snapshots
+        recent = monitor.get_recent(20)
+        if recent:
+            st.subheader("📋 Recent Snapshots")
+            # Keep Spot numeric and let the client format it
+            snapshot_df = pd.DataFrame({
+                'Timestamp': [s.get('timestamp') for s in recent],
+                'Predicted Class': [s.get('predicted_class', s.get('predicted_class_idx')) for s in recent],
+                'Spot': pd.array([s.get('spot') or None for s in recent], dtype='float64[pyarrow]')
+            })
+            st.dataframe(
+                snapshot_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={'Spot': st.column_config.NumberColumn(format="₹%.2f")}
+            )
+            
+            # Plot spot over time
+            if any(s.get('spot') for s in recent):
+                spots = [s.get('spot') for s in recent if s.get('spot')]
+                timestamps = [s.get('timestamp') for s in recent if s.get('spot')]
+                
+                fig = make_spot_line_fig(
+                    tuple(timestamps),
+                    tuple(spots),
+                    "Spot Price Over Time (Monitor)",
+                    x_label='Time',
+                    y_label='Spot Price (₹)'
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+
 def main():
     # Header
     st.markdown('<div class="main-header">📈 NSE Option Chain Predictor</div>', unsafe_allow_html=True)
@@ -136,15 +426,13 @@ def main():
         
         st.subheader("ℹ️ Market Status")
         now = datetime.now().time()
-        market_open = datetime.strptime("09:15", "%H:%M").time()
-        market_close = datetime.strptime("15:30", "%H:%M").time()
         
-        if market_open <= now <= market_close:
+        if MARKET_OPEN <= now <= MARKET_CLOSE:
             st.success("🟢 Market OPEN")
             st.caption(f"Closes at 3:30 PM IST")
         else:
             st.warning("🔴 Market CLOSED")
-            if now < market_open:
+            if now < MARKET_OPEN:
                 st.caption(f"Opens at 9:15 AM IST")
             else:
                 st.caption(f"Opens tomorrow at 9:15 AM IST")
@@ -166,115 +454,8 @@ def main():
     with tab1:
         st.header("Live Prediction & Analysis")
         
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
-            col_fetch, col_clear = st.columns([3, 1])
-            
-            with col_fetch:
-                if st.button("🔄 Fetch & Predict", type="primary", use_container_width=True):
-                    with st.spinner("Fetching option chain data and making prediction..."):
-                        result = st.session_state.predictor.fetch_and_predict(symbol)
-                        
-                        if result:
-                            result['timestamp'] = datetime.now()
-                            result['symbol'] = symbol
-                            st.session_state.predictions_history.append(result)
-                            st.success("✅ Prediction successful!")
-                        else:
-                            st.error("❌ Failed to fetch data. Market may be closed or API unavailable.")
-            
-            with col_clear:
-                if st.button("🗑️ Clear History", use_container_width=True):
-                    st.session_state.predictions_history = []
-                    st.rerun()
-        
-        with col2:
-            if st.session_state.predictions_history:
-                latest = st.session_state.predictions_history[-1]
-                st.markdown(create_prediction_card(latest), unsafe_allow_html=True)
-        
-        # Display latest prediction details
-        if st.session_state.predictions_history:
-            latest = st.session_state.predictions_history[-1]
-            
-            st.subheader("📊 Prediction Details")
-            
-            # Key metrics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                if latest.get('spot'):
-                    st.metric("Spot Price", f"₹{latest['spot']:.2f}")
-            
-            with col2:
-                if latest.get('features', {}).get('pcr'):
-                    pcr = latest['features']['pcr']
-                    st.metric("PCR", f"{pcr:.2f}")
-            
-            with col3:
-                if latest.get('features', {}).get('total_call_oi'):
-                    st.metric("Call OI", format_number(latest['features']['total_call_oi']))
-            
-            with col4:
-                if latest.get('features', {}).get('total_put_oi'):
-                    st.metric("Put OI", format_number(latest['features']['total_put_oi']))
-            
-            # Probabilities chart
-            if latest.get('probabilities'):
-                st.subheader("🎲 Prediction Probabilities")
-                prob_df = pd.DataFrame({
-                    'Class': [f"Class {i}" for i in range(len(latest['probabilities']))],
-                    'Probability': latest['probabilities']
-                })
-                
-                fig = px.bar(
-                    prob_df,
-                    x='Class',
-                    y='Probability',
-                    title="Class Probabilities",
-                    color='Probability',
-                    color_continuous_scale='Blues',
-                    text='Probability'
-                )
-                fig.update_traces(texttemplate='%{text:.2%}', textposition='outside')
-                fig.update_layout(
-                    yaxis_title="Probability",
-                    xaxis_title="Predicted Class",
-                    height=400
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            # Features table
-            if latest.get('features'):
-                st.subheader("🔍 Feature Values")
-                features = latest['features']
-                key_features = {
-                    'Spot Price': features.get('spot'),
-                    'PCR': features.get('pcr'),
-                    'ATM Strike': features.get('atm_strike'),
-                    'Max OI Strike': features.get('max_oi_strike'),
-                    'Total Call OI': features.get('total_call_oi'),
-                    'Total Put OI': features.get('total_put_oi'),
-                    'Median CE IV': features.get('median_ce_iv'),
-                    'Median PE IV': features.get('median_pe_iv'),
-                    'Median Volume': features.get('median_volume'),
-                    'OI Skew': features.get('oi_skew_mean'),
-                }
-                
-                features_df = pd.DataFrame([
-                    {'Feature': k, 'Value': v if v is not None else 'N/A'}
-                    for k, v in key_features.items()
-                ])
-                st.dataframe(features_df, use_container_width=True, hide_index=True)
-        
-        else:
-            st.info("👆 Click 'Fetch & Predict' to get your first prediction")
-        
-        # Auto-refresh logic
-        if st.session_state.auto_refresh and st.session_state.predictions_history:
-            time.sleep(st.session_state.refresh_interval)
-            st.rerun()
+        run_every = st.session_state.refresh_interval if st.session_state.auto_refresh else None
+        st.fragment(live_prediction_panel, run_every=run_every)(symbol)
     
     with tab2:
         st.header("📈 Analytics & History")
@@ -282,7 +463,14 @@ def main():
         if not st.session_state.predictions_history:
             st.info("No prediction history available. Make some predictions first!")
         else:
-            history_df = pd.DataFrame(st.session_state.predictions_history)
+            history = st.session_state.predictions_history
+            history_df, pred_counts, spot_stats = build_history_views(
+                len(history),
+                history[0].get('timestamp'),
+                history[-1].get('timestamp'),
+                st.session_state.predictor.num_classes,
+                history
+            )
             
             # Summary statistics
             st.subheader("📊 Summary Statistics")
@@ -292,53 +480,48 @@ def main():
                 st.metric("Total Predictions", len(history_df))
             
             with col2:
-                if 'spot' in history_df.columns:
-                    st.metric("Avg Spot", f"₹{history_df['spot'].mean():.2f}")
+                if spot_stats is not None:
+                    st.metric("Avg Spot", f"₹{spot_stats['mean']:.2f}")
             
             with col3:
-                if 'spot' in history_df.columns:
-                    st.metric("Min Spot", f"₹{history_df['spot'].min():.2f}")
+                if spot_stats is not None:
+                    st.metric("Min Spot", f"₹{spot_stats['min']:.2f}")
             
             with col4:
-                if 'spot' in history_df.columns:
-                    st.metric("Max Spot", f"₹{history_df['spot'].max():.2f}")
+                if spot_stats is not None:
+                    st.metric("Max Spot", f"₹{spot_stats['max']:.2f}")
             
             # Time series charts
             if 'timestamp' in history_df.columns and 'spot' in history_df.columns:
                 st.subheader("📉 Spot Price Over Time")
-                history_df['timestamp'] = pd.to_datetime(history_df['timestamp'])
-                history_df_sorted = history_df.sort_values('timestamp')
                 
-                fig = px.line(
-                    history_df_sorted,
-                    x='timestamp',
-                    y='spot',
-                    title="Spot Price Trend",
-                    markers=True
+                fig = make_spot_line_fig(
+                    tuple(history_df['timestamp']),
+                    tuple(history_df['spot']),
+                    "Spot Price Trend"
                 )
-                fig.update_layout(height=400)
                 st.plotly_chart(fig, use_container_width=True)
             
             # Prediction distribution
-            if 'predicted_class_idx' in history_df.columns:
+            if pred_counts is not None:
                 st.subheader("📊 Prediction Distribution")
-                pred_counts = history_df['predicted_class_idx'].value_counts().sort_index()
                 
-                fig = px.pie(
-                    values=pred_counts.values,
-                    names=[f"Class {i}" for i in pred_counts.index],
-                    title="Prediction Class Distribution"
+                fig = make_distribution_fig(
+                    tuple(range(len(pred_counts))),
+                    tuple(pred_counts.tolist())
                 )
                 st.plotly_chart(fig, use_container_width=True)
             
             # Recent predictions table
             st.subheader("📋 Recent Predictions")
+            # History is appended in time order, so the newest 20 are at the end
+            recent_df = pd.DataFrame(list(islice(reversed(history), 20)))
             display_cols = ['timestamp', 'symbol', 'predicted_class_idx', 'spot']
-            available_cols = [col for col in display_cols if col in history_df.columns]
+            available_cols = [col for col in display_cols if col in recent_df.columns]
             
             if available_cols:
                 st.dataframe(
-                    history_df[available_cols].tail(20).sort_values('timestamp', ascending=False),
+                    recent_df[available_cols],
                     use_container_width=True,
                     hide_index=True
                 )
@@ -390,6 +573,7 @@ def main():
                         symbol=symbol,
                         interval=interval
                     )
+                    st.session_state.monitor.running = True
                     st.success("Monitor started!")
                     st.rerun()
                 else:
@@ -406,48 +590,9 @@ def main():
         
         # Display monitor status
         if st.session_state.monitor:
-            stats = st.session_state.monitor.get_statistics()
-            if stats:
-                st.subheader("📊 Monitor Statistics")
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Total Snapshots", stats.get('total_snapshots', 0))
-                with col2:
-                    if stats.get('spot_mean'):
-                        st.metric("Avg Spot", f"₹{stats['spot_mean']:.2f}")
-                with col3:
-                    if stats.get('spot_min') and stats.get('spot_max'):
-                        st.metric("Spot Range", f"₹{stats['spot_min']:.2f} - ₹{stats['spot_max']:.2f}")
-                
-                # Recent snapshots
-                recent = st.session_state.monitor.get_recent(20)
-                if recent:
-                    st.subheader("📋 Recent Snapshots")
-                    snapshot_df = pd.DataFrame([
-                        {
-                            'Timestamp': s.get('timestamp'),
-                            'Predicted Class': s.get('predicted_class', s.get('predicted_class_idx')),
-                            'Spot': f"₹{s.get('spot', 0):.2f}" if s.get('spot') else 'N/A'
-                        }
-                        for s in recent
-                    ])
-                    st.dataframe(snapshot_df, use_container_width=True, hide_index=True)
-                    
-                    # Plot spot over time
-                    if any(s.get('spot') for s in recent):
-                        spots = [s.get('spot') for s in recent if s.get('spot')]
-                        timestamps = [s.get('timestamp') for s in recent if s.get('spot')]
-                        
-                        fig = px.line(
-                            x=timestamps,
-                            y=spots,
-                            title="Spot Price Over Time (Monitor)",
-                            labels={'x': 'Time', 'y': 'Spot Price (₹)'},
-                            markers=True
-                        )
-                        fig.update_layout(height=400)
-                        st.plotly_chart(fig, use_container_width=True)
+            monitor = st.session_state.monitor
+            run_every = monitor.interval if monitor.running else None
+            st.fragment(monitor_view, run_every=run_every)()
     
     with tab4:
         st.header("📚 About")
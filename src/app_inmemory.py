@@ -4,9 +4,9 @@ No disk reads - fetches and predicts in real-time.
 """
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
+from collections import deque
+from itertools import islice
 import time
 from src.fetch_predict import OptionChainPredictor
 from src.realtime_loop import RealtimeMonitor
@@ -19,11 +19,38 @@ st.set_page_config(
     layout="wide"
 )
 
+# Cap on in-session prediction history; oldest entries are dropped first
+MAX_HISTORY = 500
+
+
+@st.cache_resource
+def get_predictor() -> OptionChainPredictor:
+    """Load the predictor once per process and share it across sessions."""
+    return OptionChainPredictor()
+
+
+# Inputs change with every prediction; keep only the most recent figures
+@st.cache_data(show_spinner=False, max_entries=32)
+def make_spot_line_fig(timestamps, spots):
+    """Build the spot-over-time line chart from tuples of timestamps and spots."""
+    import plotly.express as px
+    
+    return px.line(x=list(timestamps), y=list(spots), 
+                   labels={'x': 'timestamp', 'y': 'spot'},
+                   title="Spot Price Over Time")
+
+
+@st.cache_data(ttl=3, show_spinner=False)
+def fetch_raw_chain(symbol):
+    """Fetch the raw NSE option chain, shared across sessions for a few seconds."""
+    return get_predictor().fetch_option_chain(symbol)
+
+
 # Initialize session state
 if 'predictor' not in st.session_state:
-    st.session_state.predictor = OptionChainPredictor()
+    st.session_state.predictor = get_predictor()
     st.session_state.monitor = None
-    st.session_state.predictions_history = []
+    st.session_state.predictions_history = deque(maxlen=MAX_HISTORY)
 
 
 def main():
@@ -45,7 +72,7 @@ def main():
         with col1:
             if st.button("Fetch & Predict", type="primary"):
                 with st.spinner("Fetching option chain and predicting..."):
-                    result = st.session_state.predictor.fetch_and_predict(symbol)
+                    result = st.session_state.predictor.predict_from_raw(fetch_raw_chain(symbol))
                     
                     if result:
                         st.session_state.predictions_history.append({
@@ -65,13 +92,7 @@ def main():
                         
                         # Probabilities
                         if result.get('probabilities'):
-                            prob_df = pd.DataFrame({
-                                'Class': range(len(result['probabilities'])),
-                                'Probability': result['probabilities']
-                            })
-                            fig = px.bar(prob_df, x='Class', y='Probability', 
-                                       title="Prediction Probabilities")
-                            st.plotly_chart(fig, use_container_width=True)
+                            st.bar_chart(pd.Series(result['probabilities'], name="Probability"))
                         
                         # Spot price
                         if result.get('spot'):
@@ -82,9 +103,10 @@ def main():
         with col2:
             st.subheader("Recent Predictions")
             if st.session_state.predictions_history:
-                history_df = pd.DataFrame(st.session_state.predictions_history)
+                recent = list(islice(reversed(st.session_state.predictions_history), 10))
+                history_df = pd.DataFrame(recent[::-1])
                 st.dataframe(
-                    history_df[['timestamp', 'symbol', 'predicted_class_idx', 'spot']].tail(10),
+                    history_df[['timestamp', 'symbol', 'predicted_class_idx', 'spot']],
                     use_container_width=True
                 )
             else:
@@ -156,8 +178,10 @@ def main():
                     
                     # Plot spot over time
                     if 'spot' in snapshot_df.columns:
-                        fig = px.line(snapshot_df, x='timestamp', y='spot', 
-                                     title="Spot Price Over Time")
+                        fig = make_spot_line_fig(
+                            tuple(snapshot_df['timestamp']),
+                            tuple(snapshot_df['spot'])
+                        )
                         st.plotly_chart(fig, use_container_width=True)
     
     with tab3:
@@ -5,7 +5,12 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from src._fast import NS_PER_DAY, decay_positions
+
+
+_OPTION_TYPES = frozenset(('CE', 'PE'))
 
 
 @dataclass
@@ -18,10 +23,149 @@ class OptionPosition:
     entry_time: datetime
     expiry: datetime
     iv: Optional[float] = None
+    is_call: bool = field(init=False)
     
     def __post_init__(self):
-        if self.option_type not in ['CE', 'PE']:
+        if self.option_type not in _OPTION_TYPES:
             raise ValueError("option_type must be 'CE' or 'PE'")
+        self.is_call = self.option_type == 'CE'
+
+
+class PositionBook:
+    """
+    Open option positions stored column-wise (struct-of-arrays).
+    
+    Arrays are over-allocated and doubled when full, so appends are
+    amortised O(1), and removal swaps the last position into the freed
+    slot. The array properties are views over the live positions.
+    """
+    
+    _COLUMNS = (
+        ('_strike', np.float64),
+        ('_premium', np.float64),
+        ('_iv', np.float64),  # NaN when unknown
+        ('_quantity', np.int64),
+        ('_expiry_ns', np.int64),
+        ('_is_call', np.bool_),
+    )
+    
+    def __init__(self, capacity: int = 16):
+        """
+        Initialize an empty book.
+        
+        Args:
+            capacity: Initial number of position slots
+        """
+        self.size = 0
+        for name, dtype in self._COLUMNS:
+            setattr(self, name, np.empty(capacity, dtype=dtype))
+        self.entry_times: List[datetime] = []
+        self.expiries: List[datetime] = []
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    @property
+    def strike(self) -> np.ndarray:
+        return self._strike[:self.size]
+    
+    @property
+    def premium(self) -> np.ndarray:
+        return self._premium[:self.size]
+    
+    @property
+    def iv(self) -> np.ndarray:
+        return self._iv[:self.size]
+    
+    @property
+    def quantity(self) -> np.ndarray:
+        return self._quantity[:self.size]
+    
+    @property
+    def expiry_ns(self) -> np.ndarray:
+        return self._expiry_ns[:self.size]
+    
+    @property
+    def is_call(self) -> np.ndarray:
+        return self._is_call[:self.size]
+    
+    def _grow(self):
+        """Double the capacity of every column."""
+        capacity = max(16, 2 * len(self._strike))
+        for name, _ in self._COLUMNS:
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+    
+    def append(
+        self,
+        strike: float,
+        option_type: str,
+        premium: float,
+        quantity: int,
+        entry_time: datetime,
+        expiry: datetime,
+        iv: Optional[float] = None
+    ):
+        """Add a position at the end of the book."""
+        if self.size == len(self._strike):
+            self._grow()
+        
+        i = self.size
+        self._strike[i] = strike
+        self._premium[i] = premium
+        self._iv[i] = np.nan if iv is None else iv
+        self._quantity[i] = quantity
+        self._expiry_ns[i] = pd.Timestamp(expiry).value
+        self._is_call[i] = option_type == 'CE'
+        self.entry_times.append(entry_time)
+        self.expiries.append(expiry)
+        self.size += 1
+    
+    def remove(self, idx: int):
+        """Remove the position at idx by moving the last position into its slot."""
+        last = self.size - 1
+        if idx != last:
+            for name, _ in self._COLUMNS:
+                column = getattr(self, name)
+                column[idx] = column[last]
+            self.entry_times[idx] = self.entry_times[last]
+            self.expiries[idx] = self.expiries[last]
+        self.entry_times.pop()
+        self.expiries.pop()
+        self.size = last
+    
+    def compact(self, keep: np.ndarray):
+        """Drop every position where keep is False in one pass, preserving order."""
+        n = int(np.count_nonzero(keep))
+        for name, _ in self._COLUMNS:
+            column = getattr(self, name)
+            column[:n] = column[:self.size][keep]
+        self.entry_times = [t for t, k in zip(self.entry_times, keep) if k]
+        self.expiries = [t for t, k in zip(self.expiries, keep) if k]
+        self.size = n
+    
+    def option_type(self, idx: int) -> str:
+        """Option type ('CE' or 'PE') of the position at idx."""
+        return 'CE' if self._is_call[idx] else 'PE'
+    
+    def days_to_expiry(self, current_time: datetime) -> np.ndarray:
+        """Whole days from current_time to each position's expiry."""
+        return (self.expiry_ns - pd.Timestamp(current_time).value) // NS_PER_DAY
+    
+    def get(self, idx: int) -> OptionPosition:
+        """Position at idx as an OptionPosition record."""
+        iv = self._iv[idx]
+        return OptionPosition(
+            strike=float(self._strike[idx]),
+            option_type=self.option_type(idx),
+            premium=float(self._premium[idx]),
+            quantity=int(self._quantity[idx]),
+            entry_time=self.entry_times[idx],
+            expiry=self.expiries[idx],
+            iv=None if np.isnan(iv) else float(iv)
+        )
 
 
 @dataclass
@@ -51,9 +195,14 @@ class OptionBacktester:
         """
         self.initial_capital = initial_capital
         self.capital = initial_capital
-        self.positions: List[OptionPosition] = []
+        self.book = PositionBook()
         self.closed_trades: List[Dict] = []
-        self.equity_curve: List[float] = []
+        self.equity_curve: np.ndarray = np.empty(0, dtype=np.float64)
+    
+    @property
+    def positions(self) -> List[OptionPosition]:
+        """Snapshot of the open positions as OptionPosition records."""
+        return [self.book.get(i) for i in range(len(self.book))]
     
     def calculate_theta(self, days_to_expiry: float, premium: float, iv: float = 0.2) -> float:
         """
@@ -112,17 +261,10 @@ class OptionBacktester:
         if cost > self.capital:
             return False
         
-        position = OptionPosition(
-            strike=strike,
-            option_type=option_type,
-            premium=premium,
-            quantity=quantity,
-            entry_time=entry_time,
-            expiry=expiry,
-            iv=iv
-        )
+        if option_type not in _OPTION_TYPES:
+            raise ValueError("option_type must be 'CE' or 'PE'")
         
-        self.positions.append(position)
+        self.book.append(strike, option_type, premium, quantity, entry_time, expiry, iv)
         self.capital -= cost
         return True
     
@@ -139,31 +281,42 @@ class OptionBacktester:
         Returns:
             Trade record dictionary or None if invalid index
         """
-        if position_idx < 0 or position_idx >= len(self.positions):
+        if position_idx < 0 or position_idx >= len(self.book):
             return None
         
-        position = self.positions.pop(position_idx)
+        trade_record = self._settle(position_idx, exit_premium, exit_time, spot)
+        self.book.remove(position_idx)
+        return trade_record
+    
+    def _settle(self, position_idx: int, exit_premium: float, exit_time: datetime, spot: float) -> Dict:
+        """Record the trade and credit capital for a position; the caller removes it from the book."""
+        book = self.book
+        strike = float(book.strike[position_idx])
+        option_type = book.option_type(position_idx)
+        premium = float(book.premium[position_idx])
+        quantity = int(book.quantity[position_idx])
+        entry_time = book.entry_times[position_idx]
         
         # Calculate P&L
-        entry_cost = position.premium * position.quantity
-        exit_value = exit_premium * position.quantity
+        entry_cost = premium * quantity
+        exit_value = exit_premium * quantity
         pnl = exit_value - entry_cost
         
         # Update capital
         self.capital += exit_value
         
         # Calculate metrics
-        holding_days = (exit_time - position.entry_time).days
-        intrinsic = self.calculate_intrinsic_value(spot, position.strike, position.option_type)
+        holding_days = (exit_time - entry_time).days
+        intrinsic = self.calculate_intrinsic_value(spot, strike, option_type)
         
         trade_record = {
-            'entry_time': position.entry_time.isoformat(),
+            'entry_time': entry_time.isoformat(),
             'exit_time': exit_time.isoformat(),
-            'strike': position.strike,
-            'option_type': position.option_type,
-            'entry_premium': position.premium,
+            'strike': strike,
+            'option_type': option_type,
+            'entry_premium': premium,
             'exit_premium': exit_premium,
-            'quantity': position.quantity,
+            'quantity': quantity,
             'pnl': pnl,
             'return_pct': (pnl / entry_cost * 100) if entry_cost > 0 else 0,
             'holding_days': holding_days,
@@ -183,26 +336,23 @@ class OptionBacktester:
             spot: Current spot price
             days_passed: Number of days passed since last update
         """
-        expired_positions = []
-        
-        for i, position in enumerate(self.positions):
-            days_to_expiry = (position.expiry - current_time).days
-            
-            # Check expiry
-            if days_to_expiry <= 0:
-                expired_positions.append((i, position))
-                continue
-            
-            # Apply theta decay (simplified)
-            if position.iv:
-                theta = self.calculate_theta(days_to_expiry, position.premium, position.iv)
-                # Update premium (simplified - in reality, need full option pricing model)
-                position.premium = max(0, position.premium - theta * days_passed)
-        
-        # Close expired positions
-        for i, position in reversed(expired_positions):
-            intrinsic = self.calculate_intrinsic_value(spot, position.strike, position.option_type)
-            self.close_position(i, intrinsic, current_time, spot)
+        book = self.book
+        if len(book) == 0:
+            return
+        
+        days_to_expiry = book.days_to_expiry(current_time)
+        
+        # Apply theta decay to live positions with an IV (simplified - in
+        # reality, need full option pricing model)
+        decay_positions(book.premium, book.iv, days_to_expiry, float(days_passed))
+        
+        # Settle expired positions, then drop them all in one compaction pass
+        expired = days_to_expiry <= 0
+        if expired.any():
+            for i in np.flatnonzero(expired)[::-1]:
+                intrinsic = self.calculate_intrinsic_value(spot, float(book.strike[i]), book.option_type(i))
+                self._settle(int(i), intrinsic, current_time, spot)
+            book.compact(~expired)
     
     def get_portfolio_value(self, current_time: datetime, spot: float) -> float:
         """
@@ -215,22 +365,28 @@ class OptionBacktester:
         Returns:
             Total portfolio value
         """
-        position_value = 0
+        book = self.book
+        if len(book) == 0:
+            return self.capital
         
-        for position in self.positions:
-            days_to_expiry = (position.expiry - current_time).days
-            
-            if days_to_expiry <= 0:
-                # Expired - use intrinsic value
-                intrinsic = self.calculate_intrinsic_value(spot, position.strike, position.option_type)
-                position_value += intrinsic * position.quantity
-            else:
-                # Use current premium (simplified - would need market data)
-                # For now, use intrinsic + some time value approximation
-                intrinsic = self.calculate_intrinsic_value(spot, position.strike, position.option_type)
-                time_value = max(0, position.premium * 0.1 * (days_to_expiry / 30))  # Rough approximation
-                position_value += (intrinsic + time_value) * position.quantity
+        strike = book.strike
+        days_to_expiry = book.days_to_expiry(current_time)
         
+        intrinsic = np.where(
+            book.is_call,
+            np.maximum(0, spot - strike),
+            np.maximum(0, strike - spot)
+        )
+        
+        # Expired positions are worth intrinsic value only; live ones add a
+        # rough time value from the current premium (would need market data)
+        time_value = np.where(
+            days_to_expiry > 0,
+            np.maximum(0, book.premium * 0.1 * (days_to_expiry / 30)),
+            0.0
+        )
+        
+        position_value = ((intrinsic + time_value) * book.quantity).sum()
         return self.capital + position_value
     
     def run_backtest(
@@ -244,27 +400,42 @@ class OptionBacktester:
         
         Args:
             historical_data: DataFrame with columns: timestamp, spot, and option chain data
-            strategy_func: Function that generates buy signals
+            strategy_func: Function that generates buy signals; called with a
+                dict of the bar's column values
             **strategy_kwargs: Additional arguments for strategy function
             
         Returns:
             BacktestResult object
         """
         self.capital = self.initial_capital
-        self.positions = []
+        self.book = PositionBook()
         self.closed_trades = []
-        self.equity_curve = []
         
         # Sort by timestamp
         data = historical_data.sort_values('timestamp').reset_index(drop=True)
-        
-        for idx, row in data.iterrows():
-            current_time = pd.to_datetime(row['timestamp'])
-            spot = row['spot']
+        # Parse timestamps once; strategies see the parsed values in their bar dicts too
+        data['timestamp'] = pd.to_datetime(data['timestamp'], cache=True)
+        
+        # Extract columns once; strategies get a plain dict per bar instead of a Series
+        timestamps = data['timestamp']
+        times = list(timestamps.dt.to_pydatetime())
+        spots = data['spot'].to_numpy(dtype=np.float64)
+        rows = data.to_dict('records')
+        self.equity_curve = np.empty(len(rows), dtype=np.float64)
+        
+        # Whole days elapsed since the previous bar (1.0 for the first bar)
+        ts_ns = timestamps.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        days_passed_arr = np.empty(len(ts_ns), dtype=np.float64)
+        days_passed_arr[:1] = 1.0
+        days_passed_arr[1:] = np.diff(ts_ns) // NS_PER_DAY
+        
+        for idx in range(len(rows)):
+            row = rows[idx]
+            current_time = times[idx]
+            spot = spots[idx]
             
             # Update existing positions
-            days_passed = 1.0 if idx == 0 else (current_time - pd.to_datetime(data.loc[idx-1, 'timestamp'])).days
-            self.update_positions(current_time, spot, days_passed)
+            self.update_positions(current_time, spot, days_passed_arr[idx])
             
             # Get strategy signals
             signals = strategy_func(row, **strategy_kwargs)
@@ -284,16 +455,14 @@ class OptionBacktester:
                         )
             
             # Record equity
-            portfolio_value = self.get_portfolio_value(current_time, spot)
-            self.equity_curve.append(portfolio_value)
+            self.equity_curve[idx] = self.get_portfolio_value(current_time, spot)
         
         # Close all remaining positions at end
-        final_time = pd.to_datetime(data.iloc[-1]['timestamp'])
-        final_spot = data.iloc[-1]['spot']
+        final_time = times[-1]
+        final_spot = spots[-1]
         
-        while self.positions:
-            position = self.positions[0]
-            intrinsic = self.calculate_intrinsic_value(final_spot, position.strike, position.option_type)
+        while len(self.book) > 0:
+            intrinsic = self.calculate_intrinsic_value(final_spot, float(self.book.strike[0]), self.book.option_type(0))
             self.close_position(0, intrinsic, final_time, final_spot)
         
         # Calculate results
@@ -314,21 +483,25 @@ class OptionBacktester:
                 trades=[]
             )
         
-        trades_df = pd.DataFrame(self.closed_trades)
+        total_trades = len(self.closed_trades)
+        pnl = np.fromiter((t['pnl'] for t in self.closed_trades), dtype=np.float64, count=total_trades)
         
-        total_pnl = trades_df['pnl'].sum()
-        total_trades = len(trades_df)
-        winning_trades = len(trades_df[trades_df['pnl'] > 0])
-        losing_trades = len(trades_df[trades_df['pnl'] <= 0])
+        total_pnl = pnl.sum()
+        win_mask = pnl > 0
+        winning_trades = int(win_mask.sum())
+        losing_trades = total_trades - winning_trades
         win_rate = winning_trades / total_trades if total_trades > 0 else 0
         
-        avg_profit = trades_df[trades_df['pnl'] > 0]['pnl'].mean() if winning_trades > 0 else 0
-        avg_loss = trades_df[trades_df['pnl'] <= 0]['pnl'].mean() if losing_trades > 0 else 0
+        avg_profit = pnl[win_mask].mean() if winning_trades > 0 else 0
+        avg_loss = pnl[~win_mask].mean() if losing_trades > 0 else 0
         
-        # Calculate max drawdown
-        equity_array = np.array(self.equity_curve)
+        # Calculate max drawdown (a zero running max counts as no drawdown)
+        equity_array = self.equity_curve
         running_max = np.maximum.accumulate(equity_array)
-        drawdown = (equity_array - running_max) / running_max
+        drawdown = np.divide(
+            equity_array - running_max, running_max,
+            out=np.zeros_like(equity_array), where=running_max != 0
+        )
         max_drawdown = abs(drawdown.min()) if len(drawdown) > 0 else 0
         
         # Calculate Sharpe ratio
@@ -4,6 +4,7 @@ Supports --once flag for single run.
 """
 import sys
 import os
+import signal
 from pathlib import Path
 
 # Add project root to path
@@ -14,26 +15,62 @@ import pandas as pd
 import argparse
 import time
 from datetime import datetime
-from typing import Optional
+from queue import Queue
+from threading import Event, Thread, current_thread, main_thread
+from typing import List, Optional
 from src.fetch_predict import OptionChainPredictor
 from src.utils import parse_strike_data, clean_numeric
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements
+    pa = None
+
 
 class OptionChainCollector:
     """Collects and saves aggregated option chain snapshots."""
     
-    def __init__(self, data_dir: str = "data/processed", symbol: str = "NIFTY"):
+    def __init__(self, data_dir: str = "data/processed", symbol: str = "NIFTY", flush_every: int = 60,
+                 flush_seconds: float = 300.0):
         """
         Initialize collector.
         
         Args:
             data_dir: Directory to save processed data
             symbol: Option symbol to collect
+            flush_every: Number of snapshots buffered in memory per output file
+            flush_seconds: Longest time a snapshot waits in the buffer before a flush
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.symbol = symbol
+        self.flush_every = max(1, flush_every)
+        self.flush_seconds = flush_seconds
         self.predictor = OptionChainPredictor()
+        self._buffer: List[pd.DataFrame] = []
+        self._buffer_started: Optional[float] = None
+        self._schema = self._snapshot_schema()
+    
+    def _snapshot_schema(self) -> Optional["pa.Schema"]:
+        """
+        Fixed parquet schema for snapshot files, built from the model's feature list.
+        
+        Writing with one schema skips per-write type inference and keeps every
+        file's columns identical, even when a payload lacks some features.
+        
+        Returns:
+            pyarrow Schema or None if pyarrow or the feature list is unavailable
+        """
+        if pa is None or not self.predictor.features:
+            return None
+        
+        fields = [
+            (name, pa.int64() if name == 'num_strikes' else pa.float64())
+            for name in self.predictor.features
+        ]
+        fields += [('timestamp', pa.timestamp('us')), ('symbol', pa.string())]
+        return pa.schema(fields)
     
     def collect_snapshot(self) -> Optional[pd.DataFrame]:
         """
@@ -44,6 +81,19 @@ class OptionChainCollector:
         """
         # Fetch option chain
         raw_data = self.predictor.fetch_option_chain(self.symbol)
+        return self.build_snapshot(raw_data)
+    
+    def build_snapshot(self, raw_data: Optional[dict], timestamp: Optional[datetime] = None) -> Optional[pd.DataFrame]:
+        """
+        Parse and aggregate an already-fetched option chain payload.
+        
+        Args:
+            raw_data: Raw NSE option chain response (None if the fetch failed)
+            timestamp: Snapshot time (defaults to now)
+            
+        Returns:
+            DataFrame with aggregated features or None if the payload is unusable
+        """
         if raw_data is None:
             return None
         
@@ -61,7 +111,7 @@ class OptionChainCollector:
         features = self.predictor.aggregate_features(strike_df, spot)
         
         # Add metadata
-        features['timestamp'] = datetime.now()
+        features['timestamp'] = timestamp or datetime.now()
         features['symbol'] = self.symbol
         
         # Convert to DataFrame
@@ -70,22 +120,60 @@ class OptionChainCollector:
     
     def save_snapshot(self, snapshot_df: pd.DataFrame, format: str = "parquet"):
         """
-        Save snapshot to disk.
+        Buffer a snapshot and write the buffer to disk every `flush_every` snapshots,
+        or once the oldest buffered snapshot has waited `flush_seconds`.
         
         Args:
             snapshot_df: DataFrame to save
             format: File format ('parquet' or 'csv')
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{self.symbol}_{timestamp}.{format}"
-        filepath = self.data_dir / filename
+        self._buffer.append(snapshot_df)
+        if self._buffer_started is None:
+            self._buffer_started = time.monotonic()
+        
+        if (len(self._buffer) >= self.flush_every
+                or time.monotonic() - self._buffer_started >= self.flush_seconds):
+            self.flush(format)
+        else:
+            print(f"Buffered snapshot ({len(self._buffer)}/{self.flush_every})")
+    
+    def flush(self, format: str = "parquet") -> Optional[Path]:
+        """
+        Write all buffered snapshots to a single file and clear the buffer.
+        
+        The file is named after the first buffered snapshot's time, so each
+        flush produces a new file alongside the existing per-snapshot files.
+        
+        Args:
+            format: File format ('parquet' or 'csv')
+            
+        Returns:
+            Path of the written file or None if the buffer was empty
+        """
+        if not self._buffer:
+            return None
         
-        if format == "parquet":
-            snapshot_df.to_parquet(filepath, index=False)
+        batch_df = pd.concat(self._buffer, ignore_index=True)
+        first_ts = batch_df['timestamp'].iloc[0] if 'timestamp' in batch_df.columns else datetime.now()
+        filepath = self.data_dir / f"{self.symbol}_{first_ts.strftime('%Y%m%d_%H%M%S')}.{format}"
+        if filepath.exists():
+            # Sub-second intervals: keep earlier flushes from the same second
+            filepath = self.data_dir / f"{self.symbol}_{first_ts.strftime('%Y%m%d_%H%M%S_%f')}.{format}"
+        
+        schema = self._schema
+        if format == "parquet" and schema is not None and set(batch_df.columns) <= set(schema.names):
+            # Features missing from this batch are written as nulls
+            table = pa.Table.from_pandas(batch_df.reindex(columns=schema.names), schema=schema, preserve_index=False)
+            pq.write_table(table, filepath, compression="zstd")
+        elif format == "parquet":
+            batch_df.to_parquet(filepath, index=False, compression="zstd")
         else:
-            snapshot_df.to_csv(filepath, index=False)
+            batch_df.to_csv(filepath, index=False)
         
-        print(f"Saved snapshot to {filepath}")
+        self._buffer.clear()
+        self._buffer_started = None
+        print(f"Saved {len(batch_df)} snapshot(s) to {filepath}")
+        return filepath
     
     def run_once(self, save: bool = True) -> Optional[pd.DataFrame]:
         """
@@ -109,10 +197,29 @@ class OptionChainCollector:
             print("Failed to collect snapshot")
             return None
     
+    def _fetch_loop(self, payloads: Queue, stop: Event, interval: float):
+        """
+        Producer for run_continuous: fetch raw payloads every `interval` seconds.
+        
+        Args:
+            payloads: Queue receiving (fetch time, raw payload) tuples
+            stop: Event that ends the loop
+            interval: Collection interval in seconds
+        """
+        while not stop.is_set():
+            started = time.monotonic()
+            print(f"Collecting snapshot for {self.symbol}...")
+            raw_data = self.predictor.fetch_option_chain(self.symbol)
+            payloads.put((datetime.now(), raw_data))
+            stop.wait(max(0.0, interval - (time.monotonic() - started)))
+    
     def run_continuous(self, interval: float = 60.0, max_snapshots: Optional[int] = None):
         """
         Run continuous collection loop.
         
+        Fetching runs on a background thread so the next request is in flight
+        while the current payload is parsed, aggregated and saved.
+        
         Args:
             interval: Collection interval in seconds
             max_snapshots: Maximum snapshots to collect (None = unlimited)
@@ -122,27 +229,49 @@ class OptionChainCollector:
         if max_snapshots:
             print(f"Max snapshots: {max_snapshots}")
         
+        # systemd/docker stop with SIGTERM: unwind through the finally below so
+        # buffered snapshots are flushed (signal handlers need the main thread)
+        previous_sigterm = None
+        if current_thread() is main_thread():
+            previous_sigterm = signal.signal(signal.SIGTERM, _exit_on_signal)
+        
         snapshot_count = 0
+        payloads: Queue = Queue(maxsize=2)
+        stop = Event()
+        fetcher = Thread(target=self._fetch_loop, args=(payloads, stop, interval), daemon=True)
         
         try:
+            fetcher.start()
             while True:
                 if max_snapshots and snapshot_count >= max_snapshots:
                     print(f"Reached max snapshots ({max_snapshots}). Stopping.")
                     break
                 
-                snapshot_df = self.run_once(save=True)
+                timestamp, raw_data = payloads.get()
+                snapshot_df = self.build_snapshot(raw_data, timestamp)
                 if snapshot_df is not None:
+                    print(f"Snapshot collected: {len(snapshot_df)} rows")
+                    self.save_snapshot(snapshot_df)
                     snapshot_count += 1
-                
-                print(f"Waiting {interval}s until next collection...")
-                time.sleep(interval)
+                else:
+                    print("Failed to collect snapshot")
         
         except KeyboardInterrupt:
             print("\nStopping collector...")
         finally:
+            stop.set()
+            self.flush()
+            if previous_sigterm is not None:
+                signal.signal(signal.SIGTERM, previous_sigterm)
             print(f"Collection stopped. Total snapshots: {snapshot_count}")
 
 
+def _exit_on_signal(signum, frame):
+    """SIGTERM handler: raise SystemExit so cleanup code runs."""
+    print(f"\nReceived signal {signum}, stopping collector...")
+    sys.exit(0)
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description="NSE Option Chain Collector")
@@ -152,13 +281,22 @@ def main():
     parser.add_argument("--max-snapshots", type=int, help="Maximum snapshots to collect")
     parser.add_argument("--once", action="store_true", help="Run once and exit")
     parser.add_argument("--format", choices=["parquet", "csv"], default="parquet", help="File format")
+    parser.add_argument("--flush-every", type=int, default=60, help="Snapshots per output file (default: 60)")
+    parser.add_argument("--flush-seconds", type=float, default=300.0,
+                        help="Write buffered snapshots at least this often (default: 300)")
     
     args = parser.parse_args()
     
-    collector = OptionChainCollector(data_dir=args.data_dir, symbol=args.symbol)
+    collector = OptionChainCollector(
+        data_dir=args.data_dir,
+        symbol=args.symbol,
+        flush_every=args.flush_every,
+        flush_seconds=args.flush_seconds
+    )
     
     if args.once:
         collector.run_once(save=True)
+        collector.flush()
     else:
         collector.run_continuous(interval=args.interval, max_snapshots=args.max_snapshots)
 
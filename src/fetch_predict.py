@@ -2,17 +2,100 @@
 In-memory fetch → aggregate → predict pipeline.
 No disk writes - designed for real-time predictions.
 """
+import asyncio
 import pandas as pd
 import numpy as np
 import requests
 import json
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 from datetime import datetime
 import lightgbm as lgb
 import joblib
 import os
+import threading
 
-from src.utils import parse_strike_data, clean_numeric, get_atm_strike, calculate_pcr
+from src.utils import parse_strike_data, clean_numeric, calculate_pcr
+
+try:
+    from numba import njit, types as nb_types
+except ImportError:  # optional: falls back to the pure-Python loop
+    njit = None
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # optional: stdlib parser accepts bytes too
+    json_loads = json.loads
+
+
+NSE_HOME_URL = "https://www.nseindia.com"
+
+
+def _oi_reductions(strikes: np.ndarray, ce_oi: np.ndarray, pe_oi: np.ndarray, spot: float):
+    """
+    Single pass over the strike arrays for the OI-based snapshot features.
+    
+    NaN OI is treated as 0 for totals and the max-OI strike, and skipped for
+    the skew mean, matching the pandas reductions this replaces.
+    
+    Args:
+        strikes: Strike prices
+        ce_oi: Call open interest per strike
+        pe_oi: Put open interest per strike
+        spot: Current spot price
+        
+    Returns:
+        Tuple of (total call OI, total put OI, max strike OI, max-OI strike,
+        mean OI skew, ATM strike)
+    """
+    total_ce = 0.0
+    total_pe = 0.0
+    max_oi = -np.inf
+    max_oi_strike = np.nan
+    skew_sum = 0.0
+    skew_count = 0
+    atm_strike = spot
+    atm_dist = np.inf
+    
+    for i in range(strikes.shape[0]):
+        ce = ce_oi[i]
+        pe = pe_oi[i]
+        ce_filled = 0.0 if np.isnan(ce) else ce
+        pe_filled = 0.0 if np.isnan(pe) else pe
+        
+        total_ce += ce_filled
+        total_pe += pe_filled
+        
+        strike_oi = ce_filled + pe_filled
+        if strike_oi > max_oi:
+            max_oi = strike_oi
+            max_oi_strike = strikes[i]
+        
+        if not (np.isnan(ce) or np.isnan(pe)):
+            skew_sum += (ce - pe) / (ce + pe + 1e-6)
+            skew_count += 1
+        
+        dist = abs(strikes[i] - spot)
+        if dist < atm_dist:
+            atm_dist = dist
+            atm_strike = strikes[i]
+    
+    skew_mean = skew_sum / skew_count if skew_count > 0 else np.nan
+    return total_ce, total_pe, max_oi, max_oi_strike, skew_mean, atm_strike
+
+
+def _non_nan(values: np.ndarray) -> np.ndarray:
+    """Drop NaNs (pandas-style skipna) before a reduction."""
+    return values[~np.isnan(values)]
+
+
+if njit is not None:
+    # Explicit signature compiles at import instead of on the first request;
+    # readonly arrays also accept the (possibly readonly) views from to_numpy()
+    _f64_array = nb_types.Array(nb_types.float64, 1, 'A', readonly=True)
+    _oi_reductions = njit(
+        nb_types.UniTuple(nb_types.float64, 6)(_f64_array, _f64_array, _f64_array, nb_types.float64),
+        cache=True
+    )(_oi_reductions)
 
 
 class OptionChainPredictor:
@@ -27,8 +110,14 @@ class OptionChainPredictor:
         """
         self.model_dir = model_dir
         self.model = None
+        self._num_iteration = None
         self.label_encoder = None
+        self._classes = None
         self.features = None
+        self._feature_keys = ()
+        self.onnx_session = None
+        self._session = None
+        self._session_lock = threading.Lock()
         self.load_model()
     
     def load_model(self):
@@ -39,13 +128,63 @@ class OptionChainPredictor:
         
         if os.path.exists(model_path):
             self.model = lgb.Booster(model_file=model_path)
+            # Fix the tree count up front (best iteration when early stopping saved one)
+            best_iteration = self.model.best_iteration
+            self._num_iteration = best_iteration if best_iteration > 0 else self.model.current_iteration()
         
         if os.path.exists(encoder_path):
             self.label_encoder = joblib.load(encoder_path)
+            # Index -> label lookup table (inverse_transform re-validates on every call)
+            self._classes = self.label_encoder.classes_
         
         if os.path.exists(features_path):
-            with open(features_path, 'r') as f:
-                self.features = json.load(f)
+            with open(features_path, 'rb') as f:
+                self.features = json_loads(f.read())
+            self._feature_keys = tuple(self.features)
+        
+        # Optional ONNX Runtime model (exported with trainer.py --export-onnx)
+        onnx_path = os.path.join(self.model_dir, "lgb_model_oversampled.onnx")
+        if os.path.exists(onnx_path):
+            try:
+                import onnxruntime as ort
+                options = ort.SessionOptions()
+                options.intra_op_num_threads = 1
+                self.onnx_session = ort.InferenceSession(
+                    onnx_path, options, providers=['CPUExecutionProvider']
+                )
+            except ImportError:
+                self.onnx_session = None
+    
+    @property
+    def num_classes(self) -> int:
+        """Number of target classes known to the loaded model (0 if none loaded)."""
+        if self.label_encoder is not None:
+            return len(self.label_encoder.classes_)
+        if self.model is not None:
+            return self.model.num_model_per_iteration()
+        return 0
+    
+    def _get_session(self) -> requests.Session:
+        """
+        Return the shared NSE HTTP session, creating and cookie-priming it on first use.
+        
+        Reusing one session keeps the connection pool (and its TLS connections)
+        alive across snapshots instead of reconnecting on every fetch. The lock
+        keeps concurrent first requests (api_server's threadpool) from each
+        building and priming a session.
+        """
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                session.headers.update({
+                    "User-Agent": "Mozilla/5.0",
+                    "Accept": "application/json",
+                    "Accept-Language": "en-US,en;q=0.9"
+                })
+                # First request to get cookies
+                session.get(NSE_HOME_URL, timeout=5)
+                self._session = session
+            return self._session
     
     def fetch_option_chain(self, symbol: str = "NIFTY", base_url: str = None) -> Optional[Dict]:
         """
@@ -63,20 +202,15 @@ class OptionChainPredictor:
         
         url = f"{base_url}?symbol={symbol}"
         
-        headers = {
-            "User-Agent": "Mozilla/5.0",
-            "Accept": "application/json",
-            "Accept-Language": "en-US,en;q=0.9"
-        }
-        
         try:
-            session = requests.Session()
-            session.headers.update(headers)
-            # First request to get cookies
-            session.get("https://www.nseindia.com")
+            session = self._get_session()
             response = session.get(url, timeout=10)
+            if response.status_code in (401, 403):
+                # Cookies expired: refresh them from the homepage and retry once
+                session.get(NSE_HOME_URL, timeout=5)
+                response = session.get(url, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             
             # Check if market is closed or data is empty
             if not data or 'records' not in data:
@@ -112,63 +246,81 @@ class OptionChainPredictor:
             return {}
         
         features = {}
+        n = len(strike_df)
+        
+        # Pull every column used below into a float64 array once (None if absent)
+        cols = {
+            name: strike_df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+            if name in strike_df.columns else None
+            for name in ('strike', 'ce_oi', 'pe_oi', 'ce_change_oi', 'pe_change_oi',
+                         'ce_iv', 'pe_iv', 'ce_volume', 'pe_volume')
+        }
+        has_oi = cols['ce_oi'] is not None and cols['pe_oi'] is not None
+        
+        # OI totals, max-OI strike, skew and ATM strike in one fused pass
+        missing = np.full(n, np.nan)
+        ce_oi = cols['ce_oi'] if cols['ce_oi'] is not None else missing
+        pe_oi = cols['pe_oi'] if cols['pe_oi'] is not None else missing
+        total_ce, total_pe, max_oi, max_oi_strike, skew_mean, atm_strike = _oi_reductions(
+            cols['strike'], ce_oi, pe_oi, float(spot)
+        )
         
         # Basic counts
-        features['num_strikes'] = len(strike_df)
+        features['num_strikes'] = n
         
         # Total OI
-        features['total_call_oi'] = strike_df['ce_oi'].sum() if 'ce_oi' in strike_df.columns else 0
-        features['total_put_oi'] = strike_df['pe_oi'].sum() if 'pe_oi' in strike_df.columns else 0
+        features['total_call_oi'] = total_ce
+        features['total_put_oi'] = total_pe
         features['pcr'] = calculate_pcr(features['total_call_oi'], features['total_put_oi'])
         
         # Top change in OI
-        if 'ce_change_oi' in strike_df.columns:
-            features['top_call_change_oi'] = strike_df['ce_change_oi'].max()
-        if 'pe_change_oi' in strike_df.columns:
-            features['top_put_change_oi'] = strike_df['pe_change_oi'].max()
+        for side in ('ce', 'pe'):
+            change_oi = cols[f'{side}_change_oi']
+            if change_oi is not None:
+                valid = _non_nan(change_oi)
+                key = 'top_call_change_oi' if side == 'ce' else 'top_put_change_oi'
+                features[key] = valid.max() if valid.size else np.nan
         
         # Median IVs
-        if 'ce_iv' in strike_df.columns:
-            features['median_ce_iv'] = strike_df['ce_iv'].median()
-        if 'pe_iv' in strike_df.columns:
-            features['median_pe_iv'] = strike_df['pe_iv'].median()
+        ce_iv = _non_nan(cols['ce_iv']) if cols['ce_iv'] is not None else None
+        pe_iv = _non_nan(cols['pe_iv']) if cols['pe_iv'] is not None else None
+        if ce_iv is not None:
+            features['median_ce_iv'] = np.median(ce_iv) if ce_iv.size else np.nan
+        if pe_iv is not None:
+            features['median_pe_iv'] = np.median(pe_iv) if pe_iv.size else np.nan
         
         # Median volume
-        if 'ce_volume' in strike_df.columns and 'pe_volume' in strike_df.columns:
-            total_volume = strike_df['ce_volume'].fillna(0) + strike_df['pe_volume'].fillna(0)
-            features['median_volume'] = total_volume.median()
+        if cols['ce_volume'] is not None and cols['pe_volume'] is not None:
+            total_volume = np.nan_to_num(cols['ce_volume']) + np.nan_to_num(cols['pe_volume'])
+            features['median_volume'] = np.median(total_volume)
         
         # Max OI strike
-        if 'ce_oi' in strike_df.columns and 'pe_oi' in strike_df.columns:
-            total_oi = strike_df['ce_oi'].fillna(0) + strike_df['pe_oi'].fillna(0)
-            max_oi_idx = total_oi.idxmax()
-            features['max_oi_strike'] = strike_df.loc[max_oi_idx, 'strike']
+        if has_oi:
+            features['max_oi_strike'] = max_oi_strike
         
         # ATM strike
-        features['atm_strike_proxy'] = get_atm_strike(spot, strike_df['strike'])
+        features['atm_strike_proxy'] = atm_strike
         features['atm_strike'] = features['atm_strike_proxy']
         
         # OI skew
-        if 'ce_oi' in strike_df.columns and 'pe_oi' in strike_df.columns:
-            oi_skew = (strike_df['ce_oi'] - strike_df['pe_oi']) / (strike_df['ce_oi'] + strike_df['pe_oi'] + 1e-6)
-            features['oi_skew_mean'] = oi_skew.mean()
+        if has_oi:
+            features['oi_skew_mean'] = skew_mean
             features['oi_skew'] = features['oi_skew_mean']
         
         # Top strike OI percentage
-        if 'ce_oi' in strike_df.columns and 'pe_oi' in strike_df.columns:
-            total_oi = features['total_call_oi'] + features['total_put_oi']
+        if has_oi:
+            total_oi = total_ce + total_pe
             if total_oi > 0:
-                max_oi = strike_df['ce_oi'].fillna(0) + strike_df['pe_oi'].fillna(0)
-                features['top_strike_oi_pct'] = max_oi.max() / total_oi
+                features['top_strike_oi_pct'] = max_oi / total_oi
         
         # Spot
         features['spot'] = spot
         features['spot_note'] = spot
         
         # Median IV (overall)
-        if 'ce_iv' in strike_df.columns and 'pe_iv' in strike_df.columns:
-            all_ivs = pd.concat([strike_df['ce_iv'], strike_df['pe_iv']]).dropna()
-            features['median_iv'] = all_ivs.median() if not all_ivs.empty else None
+        if ce_iv is not None and pe_iv is not None:
+            all_ivs = np.concatenate([ce_iv, pe_iv])
+            features['median_iv'] = np.median(all_ivs) if all_ivs.size else None
         
         return features
     
@@ -182,30 +334,57 @@ class OptionChainPredictor:
         Returns:
             Prediction dictionary with probabilities and predicted class
         """
+        results = self.predict_batch([features])
+        return results[0] if results else None
+    
+    def predict_batch(self, features_list: List[Dict[str, float]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Make predictions for several feature dictionaries with one model call.
+        
+        Args:
+            features_list: List of feature dictionaries
+            
+        Returns:
+            List of prediction dictionaries (same order as input) or None if model not loaded
+        """
         if self.model is None or self.features is None:
             return None
         
-        # Prepare feature vector
-        feature_vector = []
-        for feat in self.features:
-            feature_vector.append(features.get(feat, 0))
-        
-        X = np.array([feature_vector])
+        # Prepare feature matrix in model column order. Keep float64, the dtype the
+        # model was trained on: total OI exceeds 2**24, where float32 drops integer
+        # precision and can move values across split thresholds
+        keys = self._feature_keys
+        X = np.array([
+            [features.get(feat, 0) for feat in keys]
+            for features in features_list
+        ], dtype=np.float64)
         
         # Predict
-        probabilities = self.model.predict(X)[0]
-        predicted_class_idx = np.argmax(probabilities)
-        
-        result = {
-            'probabilities': probabilities.tolist(),
-            'predicted_class_idx': int(predicted_class_idx),
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        if self.label_encoder:
-            result['predicted_class'] = self.label_encoder.inverse_transform([predicted_class_idx])[0]
-        
-        return result
+        if self.onnx_session is not None:
+            # The ONNX export declares a float32 input tensor
+            input_name = self.onnx_session.get_inputs()[0].name
+            probabilities = self.onnx_session.run(['probabilities'], {input_name: X.astype(np.float32)})[0]
+        else:
+            probabilities = self.model.predict(X, num_iteration=self._num_iteration, validate_features=False)
+        predicted_class_idx = np.argmax(probabilities, axis=1)
+        
+        predicted_classes = None
+        if self._classes is not None:
+            predicted_classes = self._classes[predicted_class_idx]
+        
+        timestamp = datetime.now().isoformat()
+        results = []
+        for i in range(len(features_list)):
+            result = {
+                'probabilities': probabilities[i].tolist(),
+                'predicted_class_idx': int(predicted_class_idx[i]),
+                'timestamp': timestamp
+            }
+            if predicted_classes is not None:
+                result['predicted_class'] = predicted_classes[i]
+            results.append(result)
+        
+        return results
     
     def fetch_and_predict(self, symbol: str = "NIFTY") -> Optional[Dict[str, Any]]:
         """
@@ -217,8 +396,18 @@ class OptionChainPredictor:
         Returns:
             Prediction result dictionary or None if pipeline fails
         """
-        # Fetch
-        raw_data = self.fetch_option_chain(symbol)
+        return self.predict_from_raw(self.fetch_option_chain(symbol))
+    
+    def predict_from_raw(self, raw_data: Optional[Dict]) -> Optional[Dict[str, Any]]:
+        """
+        Aggregate and predict from an already-fetched option chain payload.
+        
+        Args:
+            raw_data: Raw NSE option chain response (None if the fetch failed)
+            
+        Returns:
+            Prediction result dictionary or None if pipeline fails
+        """
         if raw_data is None:
             return None
         
@@ -244,6 +433,32 @@ class OptionChainPredictor:
             prediction['num_strikes'] = len(strike_df)
         
         return prediction
+    
+    async def fetch_and_predict_async(self, symbol: str = "NIFTY") -> Optional[Dict[str, Any]]:
+        """
+        Run fetch_and_predict in a worker thread so the caller's thread is not
+        blocked on NSE I/O.
+        
+        Args:
+            symbol: Option symbol to fetch
+            
+        Returns:
+            Prediction result dictionary or None if pipeline fails
+        """
+        return await asyncio.to_thread(self.fetch_and_predict, symbol)
+    
+    async def fetch_and_predict_many(self, symbols: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Fetch and predict several symbols concurrently.
+        
+        Args:
+            symbols: Option symbols to fetch
+            
+        Returns:
+            Dictionary mapping each symbol to its prediction (or None)
+        """
+        results = await asyncio.gather(*(self.fetch_and_predict_async(s) for s in symbols))
+        return dict(zip(symbols, results))
 
 
 if __name__ == "__main__":
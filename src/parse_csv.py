@@ -2,11 +2,71 @@
 CSV parser: parse NSE .csv downloads into strike-level DataFrame.
 Optional utility for processing manually downloaded CSV files.
 """
+import os
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, List
-from src.utils import clean_numeric, parse_timestamp
+from typing import Optional, List, Tuple
+from src.utils import clean_numeric_series, parse_timestamp
+
+try:
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements
+    pa_csv = None
+
+
+# Common NSE CSV column names (may vary)
+# 'STRIKE' is the header of the nseindia.com download, whose other columns
+# repeat per side (OI, IV, ...) and are left as they are
+COLUMN_MAPPING = {
+    'Strike Price': 'strike',
+    'Strike': 'strike',
+    'STRIKE': 'strike',
+    'CALLS OI': 'ce_oi',
+    'CALLS Change in OI': 'ce_change_oi',
+    'CALLS Volume': 'ce_volume',
+    'CALLS IV': 'ce_iv',
+    'CALLS LTP': 'ce_ltp',
+    'CALLS Bid': 'ce_bid',
+    'CALLS Ask': 'ce_ask',
+    'PUTS OI': 'pe_oi',
+    'PUTS Change in OI': 'pe_change_oi',
+    'PUTS Volume': 'pe_volume',
+    'PUTS IV': 'pe_iv',
+    'PUTS LTP': 'pe_ltp',
+    'PUTS Bid': 'pe_bid',
+    'PUTS Ask': 'pe_ask',
+}
+
+NUMERIC_COLUMNS = ('strike', 'ce_oi', 'ce_change_oi', 'ce_volume', 'ce_iv', 'ce_ltp',
+                   'ce_bid', 'ce_ask', 'pe_oi', 'pe_change_oi', 'pe_volume', 'pe_iv',
+                   'pe_ltp', 'pe_bid', 'pe_ask')
+
+
+def _read_chain_csv(csv_path: str) -> pd.DataFrame:
+    """
+    Read an NSE CSV download, skipping its title row.
+    
+    Uses Arrow's multithreaded parser (which also maps NSE's '-' placeholders
+    to nulls) and falls back to pandas when pyarrow is missing, the file is
+    ragged, or its header repeats a column name (pandas de-duplicates those).
+    """
+    if pa_csv is not None:
+        try:
+            table = pa_csv.read_csv(
+                csv_path,
+                read_options=pa_csv.ReadOptions(skip_rows=1),
+                convert_options=pa_csv.ConvertOptions(
+                    null_values=['-', '', 'N/A', 'NA'], strings_can_be_null=True
+                )
+            )
+            if len(set(table.column_names)) == table.num_columns:
+                return table.to_pandas()
+        except ValueError:  # pyarrow.ArrowInvalid
+            pass
+    
+    return pd.read_csv(csv_path, skiprows=1)
 
 
 def parse_nse_csv(csv_path: str) -> Optional[pd.DataFrame]:
@@ -21,36 +81,15 @@ def parse_nse_csv(csv_path: str) -> Optional[pd.DataFrame]:
     """
     try:
         # Read CSV - NSE CSV files may have multiple header rows
-        df = pd.read_csv(csv_path, skiprows=1)  # Skip first row if it's a header
-        
-        # Common NSE CSV column names (may vary)
-        # Adjust these based on actual CSV structure
-        column_mapping = {
-            'Strike Price': 'strike',
-            'Strike': 'strike',
-            'CALLS OI': 'ce_oi',
-            'CALLS Change in OI': 'ce_change_oi',
-            'CALLS Volume': 'ce_volume',
-            'CALLS IV': 'ce_iv',
-            'CALLS LTP': 'ce_ltp',
-            'CALLS Bid': 'ce_bid',
-            'CALLS Ask': 'ce_ask',
-            'PUTS OI': 'pe_oi',
-            'PUTS Change in OI': 'pe_change_oi',
-            'PUTS Volume': 'pe_volume',
-            'PUTS IV': 'pe_iv',
-            'PUTS LTP': 'pe_ltp',
-            'PUTS Bid': 'pe_bid',
-            'PUTS Ask': 'pe_ask',
-        }
+        df = _read_chain_csv(csv_path)  # Skip first row if it's a header
         
         # Rename columns if mapping exists
-        df = df.rename(columns=column_mapping)
+        df = df.rename(columns=COLUMN_MAPPING)
         
         # Ensure strike column exists
         if 'strike' not in df.columns:
-            # Try to find strike column
-            strike_cols = [col for col in df.columns if 'strike' in col.lower() or 'strike' in col.lower()]
+            # Unknown layout: try to find strike column
+            strike_cols = [col for col in df.columns if 'strike' in str(col).lower()]
             if strike_cols:
                 df['strike'] = df[strike_cols[0]]
             else:
@@ -58,13 +97,9 @@ def parse_nse_csv(csv_path: str) -> Optional[pd.DataFrame]:
                 return None
         
         # Clean numeric columns
-        numeric_cols = ['strike', 'ce_oi', 'ce_change_oi', 'ce_volume', 'ce_iv', 'ce_ltp', 
-                       'ce_bid', 'ce_ask', 'pe_oi', 'pe_change_oi', 'pe_volume', 'pe_iv', 
-                       'pe_ltp', 'pe_bid', 'pe_ask']
-        
-        for col in numeric_cols:
+        for col in NUMERIC_COLUMNS:
             if col in df.columns:
-                df[col] = df[col].apply(clean_numeric)
+                df[col] = clean_numeric_series(df[col])
         
         # Remove rows with invalid strikes
         df = df[df['strike'].notna()].copy()
@@ -77,17 +112,73 @@ def parse_nse_csv(csv_path: str) -> Optional[pd.DataFrame]:
         return None
 
 
-def batch_parse_csv(csv_dir: str, output_dir: Optional[str] = None, format: str = "parquet") -> List[pd.DataFrame]:
+# Parquet row-group size for parsed chains (rows)
+ROW_GROUP_SIZE = 64 * 1024
+
+
+def _parse_and_save(
+    csv_file: Path,
+    output_dir: Optional[str],
+    format: str,
+    return_df: bool = True
+) -> Tuple[int, Optional[pd.DataFrame]]:
     """
-    Parse multiple CSV files from a directory.
+    Parse one CSV file and optionally save it (top-level so worker processes can run it).
+    
+    Args:
+        csv_file: CSV file to parse
+        output_dir: Optional directory to save the parsed file
+        format: Output format ('parquet' or 'csv')
+        return_df: Whether to hand the parsed DataFrame back to the caller
+        
+    Returns:
+        Tuple of (parsed row count, DataFrame or None); (0, None) if parsing
+        failed or produced no rows
+    """
+    print(f"Parsing {csv_file.name}...")
+    df = parse_nse_csv(str(csv_file))
+    if df is None or df.empty:
+        return 0, None
+    
+    # Save if output directory specified
+    if output_dir:
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        
+        output_file = output_path / f"{csv_file.stem}.{format}"
+        if format == "parquet":
+            df.to_parquet(
+                output_file, index=False, engine='pyarrow',
+                compression='snappy', row_group_size=ROW_GROUP_SIZE, use_dictionary=True
+            )
+        else:
+            df.to_csv(output_file, index=False)
+        print(f"Saved to {output_file}")
+    
+    return len(df), (df if return_df else None)
+
+
+def batch_parse_csv(
+    csv_dir: str,
+    output_dir: Optional[str] = None,
+    format: str = "parquet",
+    max_workers: Optional[int] = None,
+    return_dfs: bool = True
+) -> List[pd.DataFrame]:
+    """
+    Parse multiple CSV files from a directory, one worker process per CPU.
     
     Args:
         csv_dir: Directory containing CSV files
         output_dir: Optional directory to save parsed files
         format: Output format ('parquet' or 'csv')
+        max_workers: Worker processes (default: CPU count; 1 parses in-process)
+        return_dfs: Keep parsed DataFrames; pass False with output_dir to only
+            write files without holding every chain in memory
         
     Returns:
-        List of parsed DataFrames
+        List of parsed DataFrames (in directory listing order; empty if
+        return_dfs is False)
     """
     csv_path = Path(csv_dir)
     if not csv_path.exists():
@@ -99,28 +190,21 @@ def batch_parse_csv(csv_dir: str, output_dir: Optional[str] = None, format: str
         print(f"No CSV files found in {csv_dir}")
         return []
     
-    parsed_dfs = []
+    workers = min(max_workers or os.cpu_count() or 1, len(csv_files))
+    n = len(csv_files)
     
-    for csv_file in csv_files:
-        print(f"Parsing {csv_file.name}...")
-        df = parse_nse_csv(str(csv_file))
-        
-        if df is not None and not df.empty:
-            parsed_dfs.append(df)
-            
-            # Save if output directory specified
-            if output_dir:
-                output_path = Path(output_dir)
-                output_path.mkdir(parents=True, exist_ok=True)
-                
-                output_file = output_path / f"{csv_file.stem}.{format}"
-                if format == "parquet":
-                    df.to_parquet(output_file, index=False)
-                else:
-                    df.to_csv(output_file, index=False)
-                print(f"Saved to {output_file}")
+    if workers <= 1:
+        results = [_parse_and_save(f, output_dir, format, return_dfs) for f in csv_files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                _parse_and_save, csv_files, [output_dir] * n, [format] * n, [return_dfs] * n
+            ))
+    
+    parsed_dfs = [df for _, df in results if df is not None]
     
-    print(f"Parsed {len(parsed_dfs)} CSV files")
+    print(f"Parsed {sum(1 for rows, _ in results if rows)} CSV files")
+    print(f"Total rows parsed: {sum(rows for rows, _ in results)}")
     return parsed_dfs
 
 
@@ -133,12 +217,14 @@ def main():
     parser.add_argument("--output-dir", help="Output directory for parsed files")
     parser.add_argument("--format", choices=["parquet", "csv"], default="parquet", help="Output format")
     parser.add_argument("--batch", action="store_true", help="Process directory of CSV files")
+    parser.add_argument("--workers", type=int, help="Worker processes for --batch (default: CPU count)")
     
     args = parser.parse_args()
     
     if args.batch:
-        dfs = batch_parse_csv(args.csv_path, args.output_dir, args.format)
-        print(f"Total rows parsed: {sum(len(df) for df in dfs)}")
+        # Only the row counts are reported, so workers don't pickle DataFrames back
+        batch_parse_csv(args.csv_path, args.output_dir, args.format,
+                        max_workers=args.workers, return_dfs=False)
     else:
         df = parse_nse_csv(args.csv_path)
         if df is not None:
@@ -1,18 +1,64 @@
 """
 Short-lived in-memory loop keeping last-N snapshots in a deque.
-Designed for real-time monitoring without disk persistence.
+Designed for real-time monitoring; disk persistence is opt-in (--persist-dir)
+and written in batches.
 """
+import asyncio
+import logging
+import sys
 import time
+import numpy as np
 from collections import deque
+from logging.handlers import MemoryHandler
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator
 from src.fetch_predict import OptionChainPredictor
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements
+    pa = None
+
+
+# Per-snapshot status lines; buffered so short intervals don't write stdout every tick
+logger = logging.getLogger(__name__)
+
+
+def _status_handler(interval: float) -> MemoryHandler:
+    """
+    Build a stdout handler that writes status lines about once per second.
+    
+    Args:
+        interval: Fetch interval in seconds (sets how many lines are buffered)
+        
+    Returns:
+        MemoryHandler that also flushes immediately on warnings
+    """
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter("[%(asctime)s] %(message)s"))
+    capacity = max(1, int(1.0 / interval)) if interval > 0 else 128
+    return MemoryHandler(capacity, flushLevel=logging.WARNING, target=stream)
+
+
+def _snapshot_schema() -> 'pa.Schema':
+    """Arrow schema of a persisted monitor snapshot."""
+    return pa.schema([
+        ('timestamp', pa.timestamp('us')),
+        ('symbol', pa.string()),
+        ('spot', pa.float64()),
+        ('predicted_class', pa.string()),
+        ('predicted_class_idx', pa.int64()),
+        ('probabilities', pa.list_(pa.float64())),
+        ('date', pa.string()),
+    ])
+
 
 class RealtimeMonitor:
     """In-memory real-time option chain monitor."""
     
-    def __init__(self, max_snapshots: int = 100, symbol: str = "NIFTY", interval: float = 5.0):
+    def __init__(self, max_snapshots: int = 100, symbol: str = "NIFTY", interval: float = 5.0,
+                 persist_dir: Optional[str] = None, batch_size: int = 32):
         """
         Initialize real-time monitor.
         
@@ -20,18 +66,83 @@ class RealtimeMonitor:
             max_snapshots: Maximum number of snapshots to keep in memory
             symbol: Option symbol to monitor
             interval: Fetch interval in seconds
+            persist_dir: Directory for a date-partitioned parquet log of snapshots
+                (None keeps everything in memory)
+            batch_size: Snapshots accumulated per parquet write
+        
+        Raises:
+            ValueError: If max_snapshots is less than 1
         """
+        if max_snapshots < 1:
+            raise ValueError(f"max_snapshots must be at least 1, got {max_snapshots}")
         self.max_snapshots = max_snapshots
         self.symbol = symbol
         self.interval = interval
         self.predictor = OptionChainPredictor()
         self.snapshots = deque(maxlen=max_snapshots)
         self.running = False
+        
+        # Ring buffers mirroring the deque's scalar fields for get_statistics
+        # (NaN spot / -1 class when a snapshot lacks the field)
+        self._spots = np.full(max_snapshots, np.nan)
+        self._preds = np.full(max_snapshots, -1, dtype=np.int32)
+        self._head = 0
+        self._count = 0
+        
+        # Snapshots waiting to be written as one parquet file
+        self.persist_dir = persist_dir
+        self.batch_size = max(1, batch_size)
+        self._pending = []
+        self._schema = None
+        if persist_dir:
+            if pa is None:
+                print("Warning: pyarrow not installed, snapshots will not be persisted")
+            else:
+                self._schema = _snapshot_schema()
     
     def add_snapshot(self, snapshot: Dict[str, Any]):
         """Add a snapshot to the deque."""
-        snapshot['timestamp'] = datetime.now().isoformat()
+        now = datetime.now()
+        snapshot['timestamp'] = now.isoformat()
         self.snapshots.append(snapshot)
+        
+        spot = snapshot.get('spot')
+        pred = snapshot.get('predicted_class_idx')
+        self._spots[self._head] = np.nan if spot is None else spot
+        self._preds[self._head] = -1 if pred is None else pred
+        self._head = (self._head + 1) % self.max_snapshots
+        self._count = min(self._count + 1, self.max_snapshots)
+        
+        if self._schema is not None:
+            predicted_class = snapshot.get('predicted_class')
+            self._pending.append({
+                'timestamp': now,
+                'symbol': self.symbol,
+                'spot': spot,
+                'predicted_class': None if predicted_class is None else str(predicted_class),
+                'predicted_class_idx': pred,
+                'probabilities': snapshot.get('probabilities'),
+                'date': now.date().isoformat(),
+            })
+            if len(self._pending) >= self.batch_size:
+                self.flush_batch()
+    
+    def flush_batch(self) -> int:
+        """
+        Write pending snapshots to the parquet log as a single file.
+        
+        Returns:
+            Number of snapshots written
+        """
+        if not self._pending:
+            return 0
+        
+        # Swap the buffer out first so a stop() from another thread cannot
+        # write the same rows twice or drop one appended mid-write
+        pending, self._pending = self._pending, []
+        table = pa.Table.from_pylist(pending, schema=self._schema)
+        pq.write_to_dataset(table, root_path=self.persist_dir, partition_cols=['date'])
+        return len(pending)
     
     def get_latest(self) -> Optional[Dict[str, Any]]:
         """Get the latest snapshot."""
@@ -61,47 +172,92 @@ class RealtimeMonitor:
         """
         Run continuous monitoring loop.
         
+        Args:
+            duration: Optional duration in seconds (None = run indefinitely)
+        """
+        try:
+            asyncio.run(self.run_async(duration))
+        except KeyboardInterrupt:
+            print("\nStopping monitor...")
+    
+    async def run_async(self, duration: Optional[float] = None):
+        """
+        Monitoring loop on a fixed schedule: fetches start every `interval`
+        seconds regardless of how long each fetch takes, instead of sleeping
+        a full interval after each one.
+        
         Args:
             duration: Optional duration in seconds (None = run indefinitely)
         """
         self.running = True
-        start_time = time.time()
+        start_time = time.monotonic()
+        next_tick = start_time
         
         print(f"Starting real-time monitor for {self.symbol}")
         print(f"Interval: {self.interval}s, Max snapshots: {self.max_snapshots}")
         
+        # Use our own buffered output unless the application configured logging
+        handler = None
+        if not logger.hasHandlers():
+            handler = _status_handler(self.interval)
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+        
         try:
             while self.running:
-                if duration and (time.time() - start_time) > duration:
+                if duration and (time.monotonic() - start_time) > duration:
                     break
                 
-                snapshot = self.run_once()
+                snapshot = await self.predictor.fetch_and_predict_async(self.symbol)
                 if snapshot:
-                    print(f"[{datetime.now()}] Snapshot added: "
-                          f"Predicted={snapshot.get('predicted_class', 'N/A')}, "
-                          f"Spot={snapshot.get('spot', 'N/A')}")
+                    self.add_snapshot(snapshot)
+                    logger.info("Snapshot added: Predicted=%s, Spot=%s",
+                                snapshot.get('predicted_class', 'N/A'), snapshot.get('spot', 'N/A'))
                 else:
-                    print(f"[{datetime.now()}] Failed to fetch snapshot")
+                    logger.warning("Failed to fetch snapshot")
                 
-                time.sleep(self.interval)
+                # Skip ticks missed by a slow fetch rather than firing them back to back
+                next_tick = max(next_tick + self.interval, time.monotonic())
+                await asyncio.sleep(next_tick - time.monotonic())
         
-        except KeyboardInterrupt:
-            print("\nStopping monitor...")
         finally:
             self.running = False
+            self.flush_batch()
+            if handler is not None:
+                logger.removeHandler(handler)
+                handler.close()
             print(f"Monitor stopped. Total snapshots: {len(self.snapshots)}")
     
     def stop(self):
-        """Stop the monitoring loop."""
+        """Stop the monitoring loop and persist any pending snapshots."""
         self.running = False
+        self.flush_batch()
+    
+    async def updates(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield each new snapshot while the monitor is running.
+        
+        Polls once per interval and only yields when the latest snapshot
+        has changed, so consumers are not woken for stale data.
+        """
+        last_seen = None
+        while self.running:
+            latest = self.get_latest()
+            if latest is not None and latest is not last_seen:
+                last_seen = latest
+                yield latest
+            await asyncio.sleep(self.interval)
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get statistics about collected snapshots."""
         if not self.snapshots:
             return {}
         
-        predictions = [s.get('predicted_class_idx') for s in self.snapshots if 'predicted_class_idx' in s]
-        spots = [s.get('spot') for s in self.snapshots if 'spot' in s]
+        # Order does not matter for these reductions, so use the ring slots directly
+        predictions = self._preds[:self._count]
+        predictions = predictions[predictions >= 0]
+        spots = self._spots[:self._count]
+        spots = spots[~np.isnan(spots)]
         
         stats = {
             'total_snapshots': len(self.snapshots),
@@ -109,14 +265,14 @@ class RealtimeMonitor:
             'last_timestamp': self.snapshots[-1].get('timestamp') if self.snapshots else None,
         }
         
-        if predictions:
-            from collections import Counter
-            stats['prediction_distribution'] = dict(Counter(predictions))
+        if predictions.size:
+            classes, counts = np.unique(predictions, return_counts=True)
+            stats['prediction_distribution'] = dict(zip(classes.tolist(), counts.tolist()))
         
-        if spots:
-            stats['spot_min'] = min(spots)
-            stats['spot_max'] = max(spots)
-            stats['spot_mean'] = sum(spots) / len(spots)
+        if spots.size:
+            stats['spot_min'] = float(spots.min())
+            stats['spot_max'] = float(spots.max())
+            stats['spot_mean'] = float(spots.mean())
         
         return stats
 
@@ -130,17 +286,22 @@ if __name__ == "__main__":
     parser.add_argument("--max-snapshots", type=int, default=100, help="Maximum snapshots to keep")
     parser.add_argument("--duration", type=float, help="Run duration in seconds (default: indefinite)")
     parser.add_argument("--once", action="store_true", help="Run once and exit")
+    parser.add_argument("--persist-dir", help="Write snapshots to a parquet log in this directory")
+    parser.add_argument("--batch-size", type=int, default=32, help="Snapshots per parquet write")
     
     args = parser.parse_args()
     
     monitor = RealtimeMonitor(
         max_snapshots=args.max_snapshots,
         symbol=args.symbol,
-        interval=args.interval
+        interval=args.interval,
+        persist_dir=args.persist_dir,
+        batch_size=args.batch_size
     )
     
     if args.once:
         result = monitor.run_once()
+        monitor.flush_batch()
         if result:
             import json
             print(json.dumps(result, indent=2))
@@ -11,9 +11,15 @@ import os
 from pathlib import Path
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
-from imblearn.over_sampling import SMOTE
 from typing import Optional, Tuple
 
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements
+    pa = None
+
 
 def load_aggregated_data(data_dir: str = "data/processed") -> Optional[pd.DataFrame]:
     """
@@ -40,6 +46,19 @@ def load_aggregated_data(data_dir: str = "data/processed") -> Optional[pd.DataFr
     
     # Load parquet files if available, otherwise CSV
     files = parquet_files if parquet_files else csv_files
+    
+    if parquet_files and pa is not None:
+        try:
+            # One multithreaded scan over all files; the unified schema keeps
+            # columns that only some snapshot files have
+            schema = pa.unify_schemas([pq.read_schema(f) for f in files], promote_options="permissive")
+            dataset = ds.dataset([str(f) for f in files], schema=schema, format="parquet")
+            data = dataset.to_table(use_threads=True).to_pandas(split_blocks=True, self_destruct=True)
+            print(f"Loaded {len(data)} rows from {len(files)} files")
+            return data
+        except (pa.ArrowException, OSError) as e:
+            print(f"Dataset scan failed ({e}), loading files one by one")
+    
     dfs = []
     
     for file in files:
@@ -78,11 +97,10 @@ def prepare_features_and_target(data: pd.DataFrame, target_col: str = "target")
     exclude_cols = [target_col, 'timestamp', 'date', 'time']
     feature_cols = [col for col in data.columns if col not in exclude_cols]
     
-    X = data[feature_cols].copy()
-    y = data[target_col].copy()
-    
-    # Handle missing values
-    X = X.fillna(0)
+    # Missing values are left as NaN: LightGBM learns a default direction for
+    # them at each split, and live features arrive with NaN in the same places
+    X = data[feature_cols]
+    y = data[target_col]
     
     return X, y
 
@@ -100,7 +118,7 @@ def train_model(
     Args:
         X: Feature DataFrame
         y: Target Series
-        use_oversampling: Whether to use SMOTE oversampling
+        use_oversampling: Whether to balance classes (inverse-frequency sample weights)
         test_size: Test set size fraction
         random_state: Random seed
         
@@ -111,20 +129,27 @@ def train_model(
     label_encoder = LabelEncoder()
     y_encoded = label_encoder.fit_transform(y)
     
+    # One float64 matrix for the split and Dataset construction, so LightGBM does
+    # no further pandas-to-numpy conversions. float64 matches what predict_batch
+    # feeds the model; float32 would round total OI values above 2**24
+    feature_names = list(X.columns)
+    X_arr = X.to_numpy(dtype=np.float64)
+    
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(
-        X, y_encoded, test_size=test_size, random_state=random_state, stratify=y_encoded
+        X_arr, y_encoded, test_size=test_size, random_state=random_state, stratify=y_encoded
     )
     
-    # Oversampling if requested
+    # Balance classes by weighting rather than synthesizing minority samples
+    weights = None
     if use_oversampling:
-        print("Applying SMOTE oversampling...")
-        smote = SMOTE(random_state=random_state)
-        X_train, y_train = smote.fit_resample(X_train, y_train)
-        print(f"After oversampling: {len(X_train)} samples")
+        counts = np.bincount(y_train)
+        class_weights = len(y_train) / (len(counts) * np.maximum(counts, 1))
+        weights = class_weights[y_train]
+        print(f"Class weights: {np.round(class_weights, 3).tolist()}")
     
     # Prepare LightGBM dataset
-    train_data = lgb.Dataset(X_train, label=y_train)
+    train_data = lgb.Dataset(X_train, label=y_train, weight=weights, feature_name=feature_names)
     test_data = lgb.Dataset(X_test, label=y_test, reference=train_data)
     
     # Model parameters
@@ -138,7 +163,10 @@ def train_model(
         'feature_fraction': 0.9,
         'bagging_fraction': 0.8,
         'bagging_freq': 5,
-        'verbose': 0
+        'verbose': 0,
+        # Skip LightGBM's row-/col-wise histogram autodetection pass
+        'force_col_wise': True,
+        'num_threads': os.cpu_count() or 0
     }
     
     # Train model
@@ -146,22 +174,19 @@ def train_model(
     model = lgb.train(
         params,
         train_data,
-        valid_sets=[train_data, test_data],
-        valid_names=['train', 'eval'],
+        valid_sets=[test_data],
+        valid_names=['eval'],
         num_boost_round=1000,
         callbacks=[lgb.early_stopping(stopping_rounds=50), lgb.log_evaluation(period=100)]
     )
     
-    # Evaluate
-    y_pred = model.predict(X_test)
+    # Evaluate the trees that will be saved (early-stopping best iteration)
+    y_pred = model.predict(X_test, num_iteration=model.best_iteration)
     y_pred_class = np.argmax(y_pred, axis=1)
     accuracy = np.mean(y_pred_class == y_test)
     print(f"Test accuracy: {accuracy:.4f}")
     
-    # Feature list
-    features = list(X.columns)
-    
-    return model, label_encoder, features
+    return model, label_encoder, feature_names
 
 
 def save_model(
@@ -184,9 +209,9 @@ def save_model(
     model_path = Path(model_dir)
     model_path.mkdir(parents=True, exist_ok=True)
     
-    # Save model
+    # Save model (only up to the early-stopping best iteration, if one was found)
     model_file = model_path / f"lgb_model_{suffix}.txt"
-    model.save_model(str(model_file))
+    model.save_model(str(model_file), num_iteration=model.best_iteration if model.best_iteration > 0 else None)
     print(f"Saved model to {model_file}")
     
     # Save label encoder
@@ -201,6 +226,41 @@ def save_model(
     print(f"Saved features to {features_file}")
 
 
+def export_onnx(
+    model: lgb.Booster,
+    features: list,
+    model_dir: str = "models",
+    suffix: str = "oversampled"
+):
+    """
+    Export trained model to ONNX for ONNX Runtime inference.
+    Requires the optional onnxmltools package.
+    
+    Args:
+        model: Trained LightGBM model
+        features: List of feature names
+        model_dir: Directory to save models
+        suffix: Suffix for filenames
+    """
+    try:
+        from onnxmltools import convert_lightgbm
+        from onnxmltools.convert.common.data_types import FloatTensorType
+    except ImportError:
+        print("onnxmltools not installed - skipping ONNX export (pip install onnxmltools)")
+        return
+    
+    onnx_model = convert_lightgbm(
+        model,
+        initial_types=[('X', FloatTensorType([None, len(features)]))],
+        zipmap=False  # plain probability tensor instead of list of dicts
+    )
+    
+    onnx_file = Path(model_dir) / f"lgb_model_{suffix}.onnx"
+    with open(onnx_file, 'wb') as f:
+        f.write(onnx_model.SerializeToString())
+    print(f"Saved ONNX model to {onnx_file}")
+
+
 def main():
     """Main training pipeline."""
     import argparse
@@ -209,9 +269,10 @@ def main():
     parser.add_argument("--data-dir", default="data/processed", help="Directory with processed data")
     parser.add_argument("--model-dir", default="models", help="Directory to save models")
     parser.add_argument("--target-col", default="target", help="Target column name")
-    parser.add_argument("--no-oversampling", action="store_true", help="Disable SMOTE oversampling")
+    parser.add_argument("--no-oversampling", action="store_true", help="Disable class balancing")
     parser.add_argument("--test-size", type=float, default=0.2, help="Test set size fraction")
     parser.add_argument("--random-state", type=int, default=42, help="Random seed")
+    parser.add_argument("--export-onnx", action="store_true", help="Also export the model to ONNX")
     
     args = parser.parse_args()
     
@@ -239,6 +300,8 @@ def main():
     # Save model
     suffix = "oversampled" if not args.no_oversampling else "standard"
     save_model(model, label_encoder, features, args.model_dir, suffix)
+    if args.export_onnx:
+        export_onnx(model, features, args.model_dir, suffix)
     
     print("Training complete!")
 
@@ -3,11 +3,17 @@ Shared utility functions for NSE option chain processing.
 Includes parsing, numeric cleaning, and timestamp helpers.
 """
 import re
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, Dict, Any
 
 
+# NSE placeholders for a missing number
+_MISSING_STRINGS = frozenset(('-', '', 'N/A', 'NA'))
+
+
 def clean_numeric(value: Any) -> Optional[float]:
     """
     Clean numeric values from NSE data (handles commas, dashes, etc.)
@@ -18,26 +24,45 @@ def clean_numeric(value: Any) -> Optional[float]:
     Returns:
         Cleaned float value or None if invalid
     """
-    if value is None or pd.isna(value):
+    if value is None:
         return None
     
-    if isinstance(value, (int, float)):
-        return float(value)
-    
     if isinstance(value, str):
         # Remove commas and whitespace
         cleaned = value.replace(',', '').strip()
         # Handle dash/empty as None
-        if cleaned in ['-', '', 'N/A', 'NA']:
+        if cleaned in _MISSING_STRINGS:
             return None
         try:
             return float(cleaned)
         except ValueError:
             return None
     
+    if isinstance(value, (int, float)):
+        # NaN is the only value not equal to itself
+        return None if value != value else float(value)
+    
+    # pd.NA and anything else non-numeric
     return None
 
 
+def clean_numeric_series(values: pd.Series) -> pd.Series:
+    """
+    Vectorized clean_numeric for a whole column.
+    
+    Args:
+        values: Column of raw values (strings with commas/dashes, numbers, None)
+        
+    Returns:
+        float64 Series with NaN wherever clean_numeric would return None
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(np.float64)
+    
+    text = values.astype('string').str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(text, errors='coerce').astype(np.float64)
+
+
 def parse_timestamp(timestamp_str: str, format_str: Optional[str] = None) -> Optional[datetime]:
     """
     Parse timestamp string to datetime object.
@@ -52,22 +77,46 @@ def parse_timestamp(timestamp_str: str, format_str: Optional[str] = None) -> Opt
     if not timestamp_str:
         return None
     
+    return _parse_timestamp_cached(timestamp_str, format_str)
+
+
+# Common formats tried by parse_timestamp (at most one can match a given string)
+TIMESTAMP_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%d-%b-%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M:%S',
+    '%Y-%m-%d',
+)
+
+# Shape of the zero-padded form of each format, to pick the format without failed strptime calls
+_FORMAT_PATTERNS = (
+    (re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}'), '%Y-%m-%d %H:%M:%S'),
+    (re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}'), '%Y-%m-%dT%H:%M:%S'),
+    (re.compile(r'\d{2}-[A-Za-z]{3}-\d{4} \d{2}:\d{2}:\d{2}'), '%d-%b-%Y %H:%M:%S'),
+    (re.compile(r'\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2}'), '%d/%m/%Y %H:%M:%S'),
+    (re.compile(r'\d{4}-\d{2}-\d{2}'), '%Y-%m-%d'),
+)
+
+
+@lru_cache(maxsize=1024)
+def _parse_timestamp_cached(timestamp_str: str, format_str: Optional[str]) -> Optional[datetime]:
+    """parse_timestamp body; NSE repeats the same timestamp across every strike."""
     if format_str:
         try:
             return datetime.strptime(timestamp_str, format_str)
         except ValueError:
             return None
     
-    # Try common formats
-    formats = [
-        '%Y-%m-%d %H:%M:%S',
-        '%Y-%m-%dT%H:%M:%S',
-        '%d-%b-%Y %H:%M:%S',
-        '%d/%m/%Y %H:%M:%S',
-        '%Y-%m-%d',
-    ]
+    for pattern, fmt in _FORMAT_PATTERNS:
+        if pattern.fullmatch(timestamp_str):
+            try:
+                return datetime.strptime(timestamp_str, fmt)
+            except ValueError:
+                break
     
-    for fmt in formats:
+    # Unpadded or otherwise irregular input: try every format
+    for fmt in TIMESTAMP_FORMATS:
         try:
             return datetime.strptime(timestamp_str, fmt)
         except ValueError:
@@ -76,79 +125,172 @@ def parse_timestamp(timestamp_str: str, format_str: Optional[str] = None) -> Opt
     return None
 
 
-def parse_strike_data(raw_data: Dict[str, Any]) -> pd.DataFrame:
+# (column suffix, NSE API field) for each side of a strike
+_SIDE_FIELDS = (
+    ('oi', 'openInterest'),
+    ('change_oi', 'changeinOpenInterest'),
+    ('volume', 'totalTradedVolume'),
+    ('iv', 'impliedVolatility'),
+    ('ltp', 'lastPrice'),
+    ('bid', 'bidprice'),
+    ('ask', 'askPrice'),
+)
+CE_COLUMNS = tuple(f'ce_{name}' for name, _ in _SIDE_FIELDS)
+PE_COLUMNS = tuple(f'pe_{name}' for name, _ in _SIDE_FIELDS)
+STRIKE_COLUMNS = ('strike',) + CE_COLUMNS + PE_COLUMNS
+
+
+def _empty_strike_frame() -> pd.DataFrame:
+    """Empty strike-level DataFrame with the full float64 column schema."""
+    return pd.DataFrame({col: np.empty(0, dtype=np.float64) for col in STRIKE_COLUMNS})
+
+
+def parse_strike_data(raw_data: Dict[str, Any], downcast: bool = False) -> pd.DataFrame:
     """
     Parse raw NSE option chain data into strike-level DataFrame.
     
+    Raw values are collected first and converted a column at a time;
+    only columns holding strings go through clean_numeric per cell.
+    
     Args:
         raw_data: Raw data dictionary from NSE API
+        downcast: Store OI/volume as nullable Int32 and prices/IV/strike as
+            float32, halving the frame's memory (for callers keeping many chains)
         
     Returns:
         DataFrame with strike-level option chain data
     """
-    records = []
-    
-    if 'records' not in raw_data or 'data' not in raw_data['records']:
-        return pd.DataFrame()
-    
-    for expiry_data in raw_data['records']['data'].values():
-        if 'CE' in expiry_data or 'PE' in expiry_data:
-            strike = clean_numeric(expiry_data.get('strikePrice'))
-            if strike is None:
-                continue
-            
-            record = {'strike': strike}
-            
-            # Parse Call option data
-            if 'CE' in expiry_data:
-                ce = expiry_data['CE']
-                record.update({
-                    'ce_oi': clean_numeric(ce.get('openInterest')),
-                    'ce_change_oi': clean_numeric(ce.get('changeinOpenInterest')),
-                    'ce_volume': clean_numeric(ce.get('totalTradedVolume')),
-                    'ce_iv': clean_numeric(ce.get('impliedVolatility')),
-                    'ce_ltp': clean_numeric(ce.get('lastPrice')),
-                    'ce_bid': clean_numeric(ce.get('bidprice')),
-                    'ce_ask': clean_numeric(ce.get('askPrice')),
-                })
-            
-            # Parse Put option data
-            if 'PE' in expiry_data:
-                pe = expiry_data['PE']
-                record.update({
-                    'pe_oi': clean_numeric(pe.get('openInterest')),
-                    'pe_change_oi': clean_numeric(pe.get('changeinOpenInterest')),
-                    'pe_volume': clean_numeric(pe.get('totalTradedVolume')),
-                    'pe_iv': clean_numeric(pe.get('impliedVolatility')),
-                    'pe_ltp': clean_numeric(pe.get('lastPrice')),
-                    'pe_bid': clean_numeric(pe.get('bidprice')),
-                    'pe_ask': clean_numeric(pe.get('askPrice')),
-                })
-            
-            records.append(record)
-    
-    if not records:
-        return pd.DataFrame()
-    
-    df = pd.DataFrame(records)
-    return df.sort_values('strike').reset_index(drop=True)
+    data = (raw_data.get('records') or {}).get('data')
+    if not data:
+        return _empty_strike_frame()
+    
+    # One list per output column, filled in a single pass (None where a side is absent)
+    strikes = []
+    ce_values = tuple([] for _ in _SIDE_FIELDS)
+    pe_values = tuple([] for _ in _SIDE_FIELDS)
+    ce_seen = []
+    pe_seen = []
+    for expiry_data in data.values():
+        has_ce = 'CE' in expiry_data
+        has_pe = 'PE' in expiry_data
+        if not (has_ce or has_pe):
+            continue
+        
+        strikes.append(expiry_data.get('strikePrice'))
+        
+        # Call option data
+        if has_ce:
+            ce = expiry_data['CE']
+            for (_, field), values in zip(_SIDE_FIELDS, ce_values):
+                values.append(ce.get(field))
+        else:
+            for values in ce_values:
+                values.append(None)
+        
+        # Put option data
+        if has_pe:
+            pe = expiry_data['PE']
+            for (_, field), values in zip(_SIDE_FIELDS, pe_values):
+                values.append(pe.get(field))
+        else:
+            for values in pe_values:
+                values.append(None)
+        
+        ce_seen.append(has_ce)
+        pe_seen.append(has_pe)
+    
+    if not strikes:
+        return _empty_strike_frame()
+    
+    columns = {}
+    for col, values in zip(STRIKE_COLUMNS, (strikes,) + ce_values + pe_values):
+        try:
+            # Numbers and None (the usual JSON payload) convert directly
+            columns[col] = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            # A chain column is at most a few hundred cells; a C-driven map over
+            # clean_numeric beats building a pandas string column for them
+            columns[col] = np.fromiter(map(clean_numeric, values), dtype=np.float64, count=len(values))
+    
+    # Drop strikes that did not parse, and the columns of a side no kept strike has
+    valid = ~np.isnan(columns['strike'])
+    if not valid.any():
+        return _empty_strike_frame()
+    df = pd.DataFrame(columns)
+    if not valid.all():
+        df = df[valid]
+    if not np.asarray(ce_seen)[valid].any():
+        df = df.drop(columns=list(CE_COLUMNS))
+    if not np.asarray(pe_seen)[valid].any():
+        df = df.drop(columns=list(PE_COLUMNS))
+    
+    df = df.sort_values('strike').reset_index(drop=True)
+    if downcast:
+        df = _downcast_strike_frame(df)
+    return df
+
+
+# Whole-contract counts; everything else in a strike frame is a price, IV or strike
+_COUNT_SUFFIXES = ('_oi', '_change_oi', '_volume')
+_INT32_MIN, _INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def _downcast_strike_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Narrow a parse_strike_data frame to 4-byte dtypes.
+    
+    Count columns become nullable Int32 only when every value is a whole
+    number inside the int32 range; otherwise they stay float64.
+    
+    Args:
+        df: Strike-level DataFrame with float64 columns
+        
+    Returns:
+        DataFrame with downcast columns
+    """
+    dtypes = {}
+    for col in df.columns:
+        if col.endswith(_COUNT_SUFFIXES):
+            values = df[col].to_numpy()
+            finite = values[~np.isnan(values)]
+            if (finite.size == 0 or (
+                    np.all(finite == np.floor(finite))
+                    and finite.min() >= _INT32_MIN and finite.max() <= _INT32_MAX)):
+                dtypes[col] = 'Int32'
+        else:
+            dtypes[col] = np.float32
+    return df.astype(dtypes)
 
 
 def get_atm_strike(spot: float, strikes: pd.Series) -> float:
     """
     Find the closest strike to spot price (ATM proxy).
     
+    Uses a binary search over the sorted strikes; ties go to the lower strike.
+    
     Args:
         spot: Current spot price
-        strikes: Series of available strikes
+        strikes: Series (or array) of available strikes
         
     Returns:
         Closest strike price
     """
-    if strikes.empty:
+    values = np.asarray(strikes, dtype=np.float64)
+    if values.size == 0:
         return spot
     
-    return strikes.iloc[(strikes - spot).abs().argsort()].iloc[0]
+    # NSE chains arrive sorted by strike; only sort when they are not
+    if not np.all(values[1:] >= values[:-1]):
+        values = np.sort(values)
+    
+    idx = np.searchsorted(values, spot)
+    if idx == 0:
+        return values[0]
+    if idx == values.size:
+        return values[-1]
+    
+    lower, upper = values[idx - 1], values[idx]
+    return upper if upper - spot < spot - lower else lower
 
 
 def calculate_pcr(call_oi: float, put_oi: float) -> Optional[float]:
@@ -167,4 +309,65 @@ def calculate_pcr(call_oi: float, put_oi: float) -> Optional[float]:
     return put_oi / call_oi
 
 
+def calculate_pcr_vec(call_oi, put_oi) -> np.ndarray:
+    """
+    Vectorized calculate_pcr for arrays of OI (per strike or per snapshot).
+    
+    Args:
+        call_oi: Array-like of call open interest
+        put_oi: Array-like of put open interest
+        
+    Returns:
+        float64 array of PCR values, NaN where calculate_pcr would return None
+        or either input is missing
+    """
+    call_oi = np.asarray(call_oi, dtype=np.float64)
+    put_oi = np.asarray(put_oi, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pcr = put_oi / call_oi
+    invalid = (call_oi == 0) | ~np.isfinite(call_oi) | ~np.isfinite(put_oi)
+    return np.where(invalid, np.nan, pcr)
+
 
+def downsample_lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling for time-series plots.
+    
+    Args:
+        x: Monotonic x values (e.g. timestamps as int64 nanoseconds)
+        y: y values (same length as x, no NaNs)
+        n_out: Target number of points
+        
+    Returns:
+        Indices of the selected points (always includes first and last)
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (n_out - 2)
+    
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        
+        # Average of the next bucket is the third triangle vertex
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+        
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    
+    return indices
@@ -2,9 +2,52 @@
 Test script to fetch NSE option chain data without requiring LightGBM.
 Useful for testing during market hours or after hours.
 """
+import asyncio
 import requests
 import json
-from datetime import datetime, time
+import threading
+from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # optional: stdlib parser accepts bytes too
+    json_loads = json.loads
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "application/json",
+    "Accept-Language": "en-US,en;q=0.9"
+}
+
+# NSE trading session (IST) in minutes since midnight: 9:15 AM - 3:30 PM
+MARKET_OPEN_MIN = 9 * 60 + 15
+MARKET_CLOSE_MIN = 15 * 60 + 30
+
+# Shared across calls so cookies and pooled keep-alive connections are reused
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_session():
+    """Return the shared NSE session, creating it and fetching cookies on first use."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            # raise_on_status=False: after the last retry return the response so
+            # the status-code branches below still report it
+            retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                          raise_on_status=False)
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+            
+            # First request to get cookies
+            print("Getting session cookies...")
+            session.get("https://www.nseindia.com", timeout=10)
+            _SESSION = session
+        return _SESSION
 
 
 def fetch_option_chain(symbol="NIFTY"):
@@ -12,27 +55,17 @@ def fetch_option_chain(symbol="NIFTY"):
     print(f"=" * 60)
     print(f"Testing NSE Option Chain Data Fetch")
     print(f"=" * 60)
+    now = datetime.now()
     print(f"Symbol: {symbol}")
-    print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Time: {now.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"=" * 60)
     print()
     
     url = f"https://www.nseindia.com/api/option-chain-indices?symbol={symbol}"
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        "Accept": "application/json",
-        "Accept-Language": "en-US,en;q=0.9"
-    }
-    
     try:
         print("Connecting to NSE API...")
-        session = requests.Session()
-        session.headers.update(headers)
-        
-        # First request to get cookies
-        print("Getting session cookies...")
-        session.get("https://www.nseindia.com", timeout=10)
+        session = _get_session()
         
         print(f"Fetching option chain data for {symbol}...")
         response = session.get(url, timeout=10)
@@ -40,7 +73,7 @@ def fetch_option_chain(symbol="NIFTY"):
         print(f"Response status: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_loads(response.content)
             
             # Extract key information
             records = data.get('records', {})
@@ -67,11 +100,9 @@ def fetch_option_chain(symbol="NIFTY"):
                 print(f"  Next expiry: {expiries[0]}")
             
             # Check if market is open
-            now = datetime.now().time()
-            market_open = time(9, 15)
-            market_close = time(15, 30)
+            now_min = now.hour * 60 + now.minute
             
-            if market_open <= now <= market_close:
+            if MARKET_OPEN_MIN <= now_min < MARKET_CLOSE_MIN:
                 print("✓ Market Status: OPEN (9:15 AM - 3:30 PM IST)")
             else:
                 print("⚠ Market Status: CLOSED (Current time outside trading hours)")
@@ -105,7 +136,7 @@ def fetch_option_chain(symbol="NIFTY"):
             
         else:
             print(f"⚠ Unexpected status code: {response.status_code}")
-            print(f"Response: {response.text[:200]}")
+            print(f"Response: {response.content[:200].decode('utf-8', errors='replace')}")
             return False
             
     except requests.exceptions.Timeout:
@@ -136,8 +167,39 @@ def fetch_option_chain(symbol="NIFTY"):
         return False
 
 
+def _fetch_json(symbol):
+    """Fetch one symbol's option chain quietly; None on any failure."""
+    url = f"https://www.nseindia.com/api/option-chain-indices?symbol={symbol}"
+    try:
+        response = _get_session().get(url, timeout=10)
+        if response.status_code != 200:
+            return None
+        return json_loads(response.content)
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+
+
+async def fetch_option_chain_many(symbols):
+    """
+    Fetch several symbols concurrently over the shared connection pool.
+    
+    Args:
+        symbols: Option symbols to fetch
+        
+    Returns:
+        Dictionary mapping each symbol to its raw data (or None)
+    """
+    results = await asyncio.gather(*(asyncio.to_thread(_fetch_json, s) for s in symbols))
+    return dict(zip(symbols, results))
+
+
 if __name__ == "__main__":
     import sys
-    symbol = sys.argv[1] if len(sys.argv) > 1 else "NIFTY"
-    fetch_option_chain(symbol)
+    symbols = sys.argv[1:] or ["NIFTY"]
+    if len(symbols) == 1:
+        fetch_option_chain(symbols[0])
+    else:
+        for symbol, data in asyncio.run(fetch_option_chain_many(symbols)).items():
+            spot = (data or {}).get('records', {}).get('underlyingValue')
+            print(f"{'✓' if spot else '⚠'} {symbol}: {f'₹{spot}' if spot else 'no data'}")
 
@@ -23,9 +23,11 @@ def check_setup():
     models_dir = Path("models")
     all_present = True
     
+    # One directory listing instead of a stat() per expected file
+    present = set(os.listdir(models_dir)) if models_dir.is_dir() else set()
+    
     for filename, description in model_files.items():
-        filepath = models_dir / filename
-        if filepath.exists():
+        if filename in present:
             print(f"  ✓ {filename} ({description})")
         else:
             print(f"  ✗ {filename} ({description}) - MISSING")
@@ -39,7 +41,9 @@ def check_setup():
     for dir_path in data_dirs:
         path = Path(dir_path)
         if path.exists():
-            file_count = len(list(path.glob("*")))
+            # Stream the listing (glob("*") skips dotfiles, so do the same)
+            with os.scandir(path) as entries:
+                file_count = sum(1 for entry in entries if not entry.name.startswith("."))
             print(f"  ✓ {dir_path} ({file_count} files)")
         else:
             print(f"  ✗ {dir_path} - MISSING (will be created automatically)")